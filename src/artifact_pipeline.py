@@ -0,0 +1,223 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import fitz  # PyMuPDF
+from pdf_processor import PDFProcessor
+from xml_processor import XMLProcessor, PARSER_VERSION
+from xml_merger import XMLMerger, MERGER_VERSION
+from knowledge_graph_parser import KnowledgeGraphParser, GRAPH_PARSER_VERSION
+from model_cascade import ModelCascade, DEFAULT_VISION_TIERS, DEFAULT_TEXT_TIERS
+
+def content_hash(value) -> str:
+    """Hash a JSON-serializable value or raw bytes."""
+    if isinstance(value, bytes):
+        return hashlib.sha256(value).hexdigest()
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+class ArtifactStore:
+    def __init__(self, root: str = None):
+        """Initialize a content-addressed store of stage artifacts.
+
+        Args:
+            root (str, optional): Directory holding one subdirectory per stage
+        """
+        self.root = root or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'artifacts')
+
+    def key(self, stage: str, version: str, inputs: List[str]) -> str:
+        """Build an artifact key from the stage version and input digests."""
+        return content_hash({'stage': stage, 'version': version, 'inputs': inputs})
+
+    def path(self, stage: str, key: str) -> str:
+        return os.path.join(self.root, stage, key[:2], f'{key}.json')
+
+    def files_dir(self, stage: str, key: str) -> str:
+        """Directory for file outputs (e.g. page images) of one artifact."""
+        return os.path.join(self.root, stage, key[:2], key)
+
+    def get(self, stage: str, key: str) -> Optional[Dict]:
+        path = self.path(stage, key)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def put(self, stage: str, key: str, version: str, inputs: List[str], value) -> Dict:
+        artifact = {
+            'stage': stage,
+            'key': key,
+            'version': version,
+            'inputs': inputs,
+            'digest': content_hash(value),
+            'created': datetime.now().isoformat(),
+            'value': value,
+        }
+        path = self.path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(artifact, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return artifact
+
+class ArtifactPipeline:
+    def __init__(self, store: ArtifactStore = None, vision_model: str = 'llama3.2-vision',
+                 graph_model: str = 'llama3.2-vision', dpi: int = 300, use_cascade: bool = False):
+        """Initialize the render -> extract -> parse -> analyze -> graph pipeline.
+
+        Each stage's artifact is keyed by its version and the digests of its
+        inputs, so changing a prompt, model or parser only recomputes that
+        stage and the stages whose inputs actually changed.
+
+        Args:
+            store (ArtifactStore, optional): Artifact store
+            vision_model (str): Model used to extract XML from page images
+            graph_model (str): Model used for knowledge graph analysis
+            dpi (int): Page render resolution
+            use_cascade (bool): Try small vision and text models first, escalating
+                low-scoring outputs to vision_model and graph_model
+        """
+        self.store = store or ArtifactStore()
+        self.vision_cascade = ModelCascade(DEFAULT_VISION_TIERS[:-1] + [vision_model]) if use_cascade else None
+        self.graph_cascade = ModelCascade(DEFAULT_TEXT_TIERS[:-1] + [graph_model]) if use_cascade else None
+        self.pdf_processor = PDFProcessor(model_name=vision_model, cascade=self.vision_cascade)
+        self.xml_processor = XMLProcessor()
+        self.graph_parser = KnowledgeGraphParser(model_name=graph_model, cascade=self.graph_cascade)
+        self.dpi = dpi
+
+        # A stage is recomputed when its version string changes. The parser
+        # constants (PARSER_VERSION etc.) must be bumped whenever a code change
+        # alters the output for the same input, so stale artifacts are rebuilt.
+        self.versions = {
+            'render': f'dpi={self.dpi};fitz={fitz.VersionBind};images=digest',
+            'extract': self.pdf_processor.extraction_version(),
+            'parse': f'parser={PARSER_VERSION};merger={MERGER_VERSION}',
+            'analyze': f'model={self._models(self.graph_cascade, graph_model)};'
+                       f'prompt={content_hash(self.graph_parser.enhance_xml_prompt(""))}',
+            'graph': f'parser={GRAPH_PARSER_VERSION}',
+        }
+        self.stats = {stage: {'cached': 0, 'computed': 0} for stage in self.versions}
+
+    def _models(self, cascade: Optional[ModelCascade], model_name: str) -> str:
+        return '>'.join(cascade.models) if cascade else model_name
+
+    def _run_stage(self, stage: str, inputs: List[str], compute: Callable[[str], object]) -> Dict:
+        key = self.store.key(stage, self.versions[stage], inputs)
+        artifact = self.store.get(stage, key)
+        if artifact is not None:
+            self.stats[stage]['cached'] += 1
+            return artifact
+
+        self.stats[stage]['computed'] += 1
+        return self.store.put(stage, key, self.versions[stage], inputs, compute(key))
+
+    def _render(self, pdf_path: str, key: str) -> Dict:
+        output_dir = self.store.files_dir('render', key)
+        shutil.rmtree(output_dir, ignore_errors=True)
+        images = self.pdf_processor.pdf_to_images(pdf_path, output_dir, dpi=self.dpi)
+
+        digests = []
+        for image_path in images:
+            with open(image_path, 'rb') as f:
+                digests.append(content_hash(f.read()))
+        # Names are relative to the artifact's files dir so the store can be moved
+        return {'images': [os.path.basename(path) for path in images], 'image_digests': digests}
+
+    def _image_paths(self, render: Dict) -> List[str]:
+        files_dir = self.store.files_dir('render', render['key'])
+        return [os.path.join(files_dir, name) for name in render['value']['images']]
+
+    def _extract(self, document: str, images: List[str]) -> List[str]:
+        results = []
+        for page, image_path in enumerate(images, 1):
+            results.append(self.pdf_processor.process_image(image_path, document=document, pages=[page]))
+        return results
+
+    def _parse(self, pages: List[str]) -> Dict:
+        merged_xml = XMLMerger().merge_documents(pages)
+        tags = self.xml_processor.extract_tags(merged_xml) if merged_xml else []
+        return {'xml': merged_xml, 'tags': tags}
+
+    def _graph(self, analysis: str) -> Dict:
+        entities, relations = self.graph_parser.extract_entities_and_relations(analysis)
+        return {'entities': entities, 'relations': relations}
+
+    def build(self, pdf_path: str) -> Dict:
+        """Build every stage for one PDF, reusing cached artifacts.
+
+        Args:
+            pdf_path (str): Path to PDF file
+
+        Returns:
+            Dict: Final artifacts of each stage keyed by stage name
+        """
+        with open(pdf_path, 'rb') as f:
+            source_digest = content_hash(f.read())
+        document = os.path.basename(pdf_path)
+
+        render = self._run_stage('render', [source_digest],
+                                 lambda key: self._render(pdf_path, key))
+        # Extraction depends on the image bytes, not on where or how they were rendered
+        extract = self._run_stage('extract', render['value']['image_digests'],
+                                  lambda key: self._extract(document, self._image_paths(render)))
+        parse = self._run_stage('parse', [extract['digest']],
+                                lambda key: self._parse(extract['value']))
+
+        artifacts = {'render': render, 'extract': extract, 'parse': parse}
+        if parse['value']['xml'] is None:
+            print(f'No valid XML content found for {document}, skipping graph stages')
+            return artifacts
+
+        artifacts['analyze'] = self._run_stage(
+            'analyze', [parse['digest']],
+            lambda key: self.graph_parser.analyze_xml_with_llama(parse['value']['xml'], document))
+        artifacts['graph'] = self._run_stage(
+            'graph', [artifacts['analyze']['digest']],
+            lambda key: self._graph(artifacts['analyze']['value']))
+        return artifacts
+
+    def build_corpus(self, pdf_dir: str) -> Dict[str, Dict]:
+        """Build every PDF in a directory.
+
+        Args:
+            pdf_dir (str): Directory containing resume PDFs
+
+        Returns:
+            Dict[str, Dict]: Stage artifacts keyed by PDF path
+        """
+        results = {}
+        for pdf_path in sorted(glob.glob(os.path.join(pdf_dir, '*.pdf'))):
+            try:
+                results[pdf_path] = self.build(pdf_path)
+            except Exception as e:
+                print(f'Error building {pdf_path}: {e}')
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Incrementally process a corpus of resume PDFs')
+    parser.add_argument('pdf_dir', help='Directory containing resume PDFs')
+    parser.add_argument('--store', help='Artifact store directory')
+    parser.add_argument('--vision-model', default='llama3.2-vision')
+    parser.add_argument('--graph-model', default='llama3.2-vision')
+    parser.add_argument('--cascade', action='store_true', help='Try smaller models first')
+    args = parser.parse_args()
+
+    store = ArtifactStore(args.store) if args.store else None
+    pipeline = ArtifactPipeline(store, args.vision_model, args.graph_model, use_cascade=args.cascade)
+    pipeline.build_corpus(args.pdf_dir)
+
+    for stage, counts in pipeline.stats.items():
+        print(f"{stage:8} computed: {counts['computed']:5}  cached: {counts['cached']:5}")
+
+    for name, cascade in (('Vision', pipeline.vision_cascade), ('Graph analysis', pipeline.graph_cascade)):
+        if cascade:
+            print(f"\n{name} cascade:")
+            cascade.print_report()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import tempfile
+import time
+from typing import Dict, List
+
+from pdf_processor import PDFProcessor
+from xml_processor import XMLProcessor
+
+def count_filled_tags(xml_processor: XMLProcessor, content: str) -> int:
+    """Count leaf tags with content, as a rough measure of extracted information."""
+    xml_content = xml_processor.extract_xml_from_text(content)
+    if not xml_content:
+        return 0
+
+    def count(tags: List[Dict]) -> int:
+        return sum(count(tag['nested']) if tag['nested'] else int(bool(tag['content'])) for tag in tags)
+
+    return count(xml_processor.extract_tags(xml_content))
+
+def benchmark_page(processor: PDFProcessor, xml_processor: XMLProcessor, image_path: str) -> Dict:
+    """Run one page through the model and collect token and timing stats."""
+    start = time.perf_counter()
+    response = processor.session.chat(processor.get_page_instruction(1), images=[image_path])
+    wall_time = time.perf_counter() - start
+
+    metrics = processor.session.last_metrics
+    content = processor.expand_response(response)
+    return {
+        'prompt_tokens': metrics['prompt_eval_count'],
+        'output_tokens': metrics['eval_count'],
+        'eval_seconds': metrics['eval_duration'] / 1e9,
+        'wall_seconds': wall_time,
+        'filled_tags': count_filled_tags(xml_processor, content),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare full and compact extraction schemas')
+    parser.add_argument('pdf_path', help='Resume PDF to benchmark')
+    parser.add_argument('--model', default='llama3.2-vision')
+    args = parser.parse_args()
+
+    xml_processor = XMLProcessor()
+    with tempfile.TemporaryDirectory() as image_dir:
+        images = PDFProcessor(model_name=args.model).pdf_to_images(args.pdf_path, image_dir)
+
+        summary = {}
+        for mode in ('full', 'compact'):
+            processor = PDFProcessor(model_name=args.model, schema_mode=mode)
+            # Load the model and this mode's system prompt so the first page does not pay for it
+            processor.warm_up()
+            print(f'\n{mode} schema:')
+            pages = []
+            for page, image_path in enumerate(images, 1):
+                stats = benchmark_page(processor, xml_processor, image_path)
+                pages.append(stats)
+                print(f"  page {page}: {stats['output_tokens']:5} output tokens, "
+                      f"{stats['eval_seconds']:6.1f}s decode, {stats['wall_seconds']:6.1f}s wall, "
+                      f"{stats['filled_tags']:4} filled tags")
+            summary[mode] = pages
+
+    print('\nPer-page averages:')
+    for mode, pages in summary.items():
+        n = len(pages) or 1
+        print(f"  {mode:8} {sum(p['output_tokens'] for p in pages) / n:7.0f} output tokens  "
+              f"{sum(p['wall_seconds'] for p in pages) / n:6.1f}s wall  "
+              f"{sum(p['filled_tags'] for p in pages) / n:5.0f} filled tags")
+
+if __name__ == '__main__':
+    main()
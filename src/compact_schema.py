@@ -0,0 +1,147 @@
+import re
+import xml.etree.ElementTree as ET
+from typing import Optional
+
+class CompactSchemaExpander:
+    def __init__(self):
+        """Initialize the expander from the compact prompt schema to the full one.
+
+        The full tree matches PDFProcessor.get_structured_prompt, which is what
+        XMLProcessor and the rest of the pipeline consume.
+        """
+        self.compact_pattern = re.compile(r'<r>[\s\S]*?</r>')
+        self.bare_ampersand_pattern = re.compile(r'&(?!\w+;|#\d+;|#x[0-9a-fA-F]+;)')
+        self.proficiency = {'e': 'expert', 'a': 'advanced', 'i': 'intermediate', 'b': 'beginner'}
+
+    def expand(self, content: str) -> Optional[str]:
+        """Expand a compact LLaMA response into the canonical <resume> XML.
+
+        Args:
+            content (str): Raw LLaMA response containing an <r> element
+
+        Returns:
+            Optional[str]: Canonical XML, or None if no valid compact XML was found
+        """
+        match = self.compact_pattern.search(content)
+        if not match:
+            return None
+
+        try:
+            compact = ET.fromstring(self.bare_ampersand_pattern.sub('&amp;', match.group(0)))
+        except ET.ParseError as e:
+            print(f'Error parsing compact XML: {e}')
+            return None
+
+        resume = ET.Element('resume')
+        self._expand_header(resume, compact.find('h'))
+        self._expand_skills(resume, compact)
+        self._expand_experience(resume, compact.find('x'))
+        self._expand_education(resume, compact.find('ed'))
+        self._expand_certifications(resume, compact.find('ce'))
+        self._expand_projects(resume, compact.find('pj'))
+
+        ET.indent(resume)
+        return ET.tostring(resume, encoding='unicode')
+
+    def _text(self, parent: ET.Element, tag: str, value: Optional[str]) -> ET.Element:
+        element = ET.SubElement(parent, tag)
+        element.text = (value or '').strip()
+        return element
+
+    def _list(self, parent: ET.Element, tag: str, item_tag: str, values: str) -> ET.Element:
+        element = ET.SubElement(parent, tag)
+        for value in (values or '').split(';'):
+            if value.strip():
+                self._text(element, item_tag, value)
+        return element
+
+    def _expand_header(self, resume: ET.Element, header: Optional[ET.Element]) -> None:
+        element = ET.SubElement(resume, 'header')
+        header = header if header is not None else ET.Element('h')
+        self._text(element, 'name', header.get('n'))
+        self._text(element, 'title', header.get('t'))
+        self._text(element, 'summary', header.text)
+
+    def _expand_skills(self, resume: ET.Element, compact: ET.Element) -> None:
+        skills = ET.SubElement(resume, 'skills')
+        technical = ET.SubElement(skills, 'technical')
+        for skill in compact.findall('ts/s'):
+            element = ET.SubElement(technical, 'skill')
+            self._text(element, 'name', skill.get('n'))
+            level = (skill.get('p') or '').strip()
+            self._text(element, 'proficiency', self.proficiency.get(level.lower(), level))
+            self._text(element, 'context', skill.get('c'))
+
+        soft = ET.SubElement(skills, 'soft')
+        for skill in compact.findall('ss/s'):
+            element = ET.SubElement(soft, 'skill')
+            self._text(element, 'name', skill.get('n'))
+            self._text(element, 'demonstration', skill.get('d'))
+
+    def _expand_experience(self, resume: ET.Element, experience: Optional[ET.Element]) -> None:
+        element = ET.SubElement(resume, 'experience')
+        for position in (experience.findall('p') if experience is not None else []):
+            item = ET.SubElement(element, 'position')
+            self._text(item, 'company', position.get('c'))
+            self._text(item, 'title', position.get('t'))
+            duration = ET.SubElement(item, 'duration')
+            self._text(duration, 'start', position.get('s'))
+            self._text(duration, 'end', position.get('e'))
+
+            responsibilities = ET.SubElement(item, 'responsibilities')
+            for responsibility in position.findall('i'):
+                self._text(responsibilities, 'item', responsibility.text)
+
+            achievements = ET.SubElement(item, 'achievements')
+            for achievement in position.findall('a'):
+                entry = ET.SubElement(achievements, 'achievement')
+                self._text(entry, 'description', achievement.text)
+                self._text(entry, 'impact', achievement.get('m'))
+                self._list(entry, 'technologies_used', 'tech', achievement.get('k'))
+
+    def _expand_education(self, resume: ET.Element, education: Optional[ET.Element]) -> None:
+        element = ET.SubElement(resume, 'education')
+        for degree in (education.findall('d') if education is not None else []):
+            item = ET.SubElement(element, 'degree')
+            self._text(item, 'level', degree.get('l'))
+            self._text(item, 'field', degree.get('f'))
+            self._text(item, 'institution', degree.get('u'))
+            graduation = ET.SubElement(item, 'graduation')
+            self._text(graduation, 'status', degree.get('st'))
+            self._text(graduation, 'date', degree.get('dt'))
+            self._list(item, 'relevantCourses', 'course', degree.get('k'))
+
+    def _expand_certifications(self, resume: ET.Element, certifications: Optional[ET.Element]) -> None:
+        element = ET.SubElement(resume, 'certifications')
+        for certification in (certifications.findall('c') if certifications is not None else []):
+            item = ET.SubElement(element, 'certification')
+            self._text(item, 'name', certification.get('n'))
+            self._text(item, 'issuer', certification.get('i'))
+            self._text(item, 'date', certification.get('dt'))
+            self._text(item, 'status', certification.get('st'))
+
+    def _expand_projects(self, resume: ET.Element, projects: Optional[ET.Element]) -> None:
+        element = ET.SubElement(resume, 'projects')
+        for project in (projects.findall('j') if projects is not None else []):
+            item = ET.SubElement(element, 'project')
+            self._text(item, 'name', project.get('n'))
+            self._text(item, 'description', project.text)
+            self._list(item, 'technologies', 'tech', project.get('k'))
+            self._text(item, 'outcome', project.get('o'))
+
+def main():
+    # Example usage with a compact response
+    content = """<r>
+<h n="Kirk F Truax" t="Software Development Apprentice">Engineer and former naval officer</h>
+<ts><s n="Python" p="a" c="Flask services"/></ts>
+<x><p c="Creating Coding Careers" t="Software Development Apprentice" s="2024-02" e="2024-08">
+<i>Built REST APIs</i>
+<a m="Cut build time 40%" k="Docker;GitHub Actions">Automated CI pipeline</a>
+</p></x>
+</r>"""
+
+    expander = CompactSchemaExpander()
+    print(expander.expand(content))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+import fitz  # PyMuPDF
+from pdf_processor import PDFProcessor
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+class ResumeFingerprinter:
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, thumbnail_scale: float = 0.25):
+        """Initialize fingerprinting of PDF text layers and page renders.
+
+        Args:
+            num_perm (int): Number of MinHash permutations
+            shingle_size (int): Words per text shingle
+            thumbnail_scale (float): Render scale for perceptual page hashes
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.thumbnail_scale = thumbnail_scale
+        self.word_pattern = re.compile(r'\w+')
+
+        # Fixed seeds keep signatures comparable across runs
+        self.permutations = []
+        for i in range(num_perm):
+            digest = hashlib.sha256(f'minhash-{i}'.encode('utf-8')).digest()
+            a = int.from_bytes(digest[:8], 'big') % (MERSENNE_PRIME - 1) + 1
+            b = int.from_bytes(digest[8:16], 'big') % MERSENNE_PRIME
+            self.permutations.append((a, b))
+
+    def shingles(self, text: str) -> Set[int]:
+        """Hash overlapping word shingles of normalized text."""
+        words = self.word_pattern.findall(text.lower())
+        if len(words) < self.shingle_size:
+            words = words + [''] * (self.shingle_size - len(words))
+
+        shingles = set()
+        for i in range(len(words) - self.shingle_size + 1):
+            shingle = ' '.join(words[i:i + self.shingle_size])
+            shingles.add(int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big'))
+        return shingles
+
+    def minhash(self, shingles: Set[int]) -> List[int]:
+        """Compute the MinHash signature of a shingle set."""
+        return [min((a * s + b) % MERSENNE_PRIME for s in shingles) for a, b in self.permutations]
+
+    def page_hash(self, page) -> Tuple[int, str]:
+        """Hash a low-resolution page render.
+
+        Returns:
+            Tuple[int, str]: 64-bit difference hash (dHash) and SHA-256 of the render pixels
+        """
+        pix = page.get_pixmap(matrix=fitz.Matrix(self.thumbnail_scale, self.thumbnail_scale),
+                              colorspace=fitz.csGRAY, alpha=False)
+        samples, width, height, stride = pix.samples, pix.width, pix.height, pix.stride
+
+        # Average the render down to a 9x8 grid
+        grid = []
+        for gy in range(8):
+            y0, y1 = gy * height // 8, max((gy + 1) * height // 8, gy * height // 8 + 1)
+            row = []
+            for gx in range(9):
+                x0, x1 = gx * width // 9, max((gx + 1) * width // 9, gx * width // 9 + 1)
+                total = sum(sum(samples[y * stride + x0:y * stride + x1]) for y in range(y0, y1))
+                row.append(total / ((y1 - y0) * (x1 - x0)))
+            grid.append(row)
+
+        bits = 0
+        for row in grid:
+            for x in range(8):
+                bits = (bits << 1) | (row[x] > row[x + 1])
+        return bits, hashlib.sha256(samples).hexdigest()
+
+    def fingerprint(self, pdf_path: str) -> Dict:
+        """Fingerprint a PDF as a whole and page by page.
+
+        Args:
+            pdf_path (str): Path to PDF file
+
+        Returns:
+            Dict: Document id, whether it has a text layer, document MinHash and per-page
+            MinHash, text hash, dHash and render hash
+        """
+        with open(pdf_path, 'rb') as f:
+            document_id = hashlib.sha256(f.read()).hexdigest()
+
+        pages = []
+        document_shingles = set()
+        with fitz.open(pdf_path) as doc:
+            for page in doc:
+                text = page.get_text()
+                has_text = bool(self.word_pattern.search(text))
+                shingles = self.shingles(text)
+                if has_text:
+                    document_shingles |= shingles
+                phash, render_sha = self.page_hash(page)
+                pages.append({
+                    'has_text': has_text,
+                    'text_sha': hashlib.sha256(' '.join(text.split()).encode('utf-8')).hexdigest(),
+                    'minhash': self.minhash(shingles),
+                    'phash': phash,
+                    'render_sha': render_sha,
+                })
+
+        return {
+            'id': document_id,
+            'has_text': bool(document_shingles),
+            'minhash': self.minhash(document_shingles or self.shingles('')),
+            'pages': pages,
+        }
+
+def minhash_similarity(a: List[int], b: List[int]) -> float:
+    """Estimate Jaccard similarity from two MinHash signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+class DuplicateIndex:
+    def __init__(self, index_dir: str = None, bands: int = 32, rows: int = 4):
+        """Initialize an LSH index over processed document fingerprints.
+
+        Args:
+            index_dir (str, optional): Directory storing one JSON file per document
+            bands (int): LSH bands; bands * rows must equal the MinHash length
+            rows (int): Signature rows per band
+        """
+        self.index_dir = index_dir or os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                                   'llama_outputs', 'dedup_index')
+        os.makedirs(self.index_dir, exist_ok=True)
+        self.bands = bands
+        self.rows = rows
+        self.fingerprints: Dict[str, Dict] = {}
+        self.versions: Dict[str, Optional[str]] = {}
+        self.buckets: Dict[Tuple[int, int], Set[str]] = {}
+        self._lock = threading.Lock()
+
+        for path in glob.glob(os.path.join(self.index_dir, '*.json')):
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            self.versions[entry['fingerprint']['id']] = entry.get('version')
+            self._add_to_buckets(entry['fingerprint'])
+
+    def _band_keys(self, minhash: List[int]) -> List[Tuple[int, int]]:
+        return [(band, hash(tuple(minhash[band * self.rows:(band + 1) * self.rows])))
+                for band in range(self.bands)]
+
+    def _add_to_buckets(self, fingerprint: Dict) -> None:
+        self.fingerprints[fingerprint['id']] = fingerprint
+        # Every document without a text layer has the same signature, so
+        # those are only found again by their exact file hash
+        if not fingerprint.get('has_text'):
+            return
+        for key in self._band_keys(fingerprint['minhash']):
+            self.buckets.setdefault(key, set()).add(fingerprint['id'])
+
+    def query(self, fingerprint: Dict, threshold: float = 0.8) -> Optional[Tuple[str, float]]:
+        """Find the most similar indexed document above a similarity threshold.
+
+        Args:
+            fingerprint (Dict): Fingerprint from ResumeFingerprinter.fingerprint
+            threshold (float): Minimum estimated Jaccard similarity
+
+        Returns:
+            Optional[Tuple[str, float]]: Document id and similarity of the best match
+        """
+        with self._lock:
+            if fingerprint['id'] in self.fingerprints:
+                return fingerprint['id'], 1.0
+            if not fingerprint['has_text']:
+                return None
+
+            candidates = set()
+            for key in self._band_keys(fingerprint['minhash']):
+                candidates |= self.buckets.get(key, set())
+
+        best = None
+        for candidate in candidates:
+            similarity = minhash_similarity(fingerprint['minhash'], self.fingerprints[candidate]['minhash'])
+            if similarity >= threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        return best
+
+    def load_results(self, document_id: str) -> List[str]:
+        with open(os.path.join(self.index_dir, f'{document_id}.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)['results']
+
+    def add(self, fingerprint: Dict, results: List[str], version: str = None) -> None:
+        """Store a document fingerprint with its per-page model outputs.
+
+        Args:
+            fingerprint (Dict): Fingerprint from ResumeFingerprinter.fingerprint
+            results (List[str]): Model output for each page
+            version (str, optional): Extraction version the outputs were produced with
+        """
+        path = os.path.join(self.index_dir, f"{fingerprint['id']}.json")
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': fingerprint, 'results': results, 'version': version},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.versions[fingerprint['id']] = version
+            self._add_to_buckets(fingerprint)
+
+class DeduplicatingProcessor:
+    def __init__(self, processor: PDFProcessor = None, index: DuplicateIndex = None,
+                 fingerprinter: ResumeFingerprinter = None, document_threshold: float = 0.8,
+                 max_hamming: int = 6):
+        """Initialize near-duplicate aware PDF processing.
+
+        Args:
+            processor (PDFProcessor, optional): Processor used for pages that changed
+            index (DuplicateIndex, optional): Index of already processed documents
+            fingerprinter (ResumeFingerprinter, optional): Fingerprinting stage
+            document_threshold (float): Similarity above which a document is a near-duplicate
+            max_hamming (int): Largest dHash distance for a reused page
+        """
+        self.processor = processor or PDFProcessor()
+        self.index = index or DuplicateIndex()
+        self.fingerprinter = fingerprinter or ResumeFingerprinter()
+        self.document_threshold = document_threshold
+        self.max_hamming = max_hamming
+        self.stats = {'documents': 0, 'near_duplicates': 0, 'stale_matches': 0,
+                      'pages_reused': 0, 'pages_processed': 0}
+
+    def _same_page(self, page: Dict, other: Dict) -> bool:
+        # Without text, pages built from the same template differ only in a
+        # few pixels, so only an identical render is reused
+        if not page['has_text'] or not other.get('has_text'):
+            return page['render_sha'] == other.get('render_sha')
+        # A similar text layer is not enough: a changed phone number or date
+        # is a different extraction, so the text must be identical
+        return (page['text_sha'] == other['text_sha']
+                and hamming_distance(page['phash'], other['phash']) <= self.max_hamming)
+
+    def process_pdf(self, pdf_path: str, save_images: bool = False, document: str = None) -> List[str]:
+        """Process a PDF, reusing outputs of unchanged pages from a near-duplicate.
+
+        Args:
+            pdf_path (str): Path to PDF file
+            save_images (bool): Whether to save intermediate images
+            document (str, optional): Name recorded in the run log, defaults to the file name
+
+        Returns:
+            List[str]: Generated XML for each page
+        """
+        fingerprint = self.fingerprinter.fingerprint(pdf_path)
+        version = self.processor.extraction_version()
+        match = self.index.query(fingerprint, self.document_threshold)
+        self.stats['documents'] += 1
+        if match and self.index.versions.get(match[0]) != version:
+            # Outputs from another model or prompt are not reused; the entry
+            # is replaced once this document has been extracted again
+            self.stats['stale_matches'] += 1
+            match = None
+
+        results: List[Optional[str]] = [None] * len(fingerprint['pages'])
+        if match:
+            self.stats['near_duplicates'] += 1
+            previous_pages = self.index.fingerprints[match[0]]['pages']
+            previous_results = self.index.load_results(match[0])
+            for i, page in enumerate(fingerprint['pages']):
+                # Prefer the page at the same position, then any matching page
+                order = [i] + [j for j in range(len(previous_pages)) if j != i]
+                for j in order:
+                    if j < len(previous_pages) and self._same_page(page, previous_pages[j]):
+                        results[i] = previous_results[j]
+                        break
+
+        changed = [i for i, content in enumerate(results) if content is None]
+        self.stats['pages_reused'] += len(results) - len(changed)
+        self.stats['pages_processed'] += len(changed)
+
+        if changed:
+            output_dir = None
+            if save_images:
+                output_dir = os.path.join(os.path.dirname(pdf_path), 'processed_images')
+            images = self.processor.pdf_to_images(pdf_path, output_dir, pages=changed)
+
+            document = document or os.path.basename(pdf_path)
+            for page_num, img_path in zip(changed, images):
+                results[page_num] = self.processor.process_image(
+                    img_path, document=document, pages=[page_num + 1],
+                    near_duplicate_of=match[0] if match else None)
+
+        if match is None or match[0] != fingerprint['id']:
+            self.index.add(fingerprint, results, version)
+        return results
+
+def main():
+    # Example usage: process a folder of resumes, reusing near-duplicate pages
+    pdf_dir = r'C:\Users\ktrua\anthropic_test\temp files'
+    processor = DeduplicatingProcessor()
+
+    for pdf_path in sorted(glob.glob(os.path.join(pdf_dir, '*.pdf'))):
+        processor.process_pdf(pdf_path)
+
+    print(processor.stats)
+
+if __name__ == '__main__':
+    main()
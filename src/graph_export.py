@@ -0,0 +1,360 @@
+import argparse
+import json
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Entity types that mean the same thing on every resume; all other entities
+# (positions, projects, degrees) belong to the resume they were found on
+SHARED_TYPES = ('TechnicalSkill', 'SoftSkill')
+
+def entity_label(entity: Dict) -> str:
+    """Pick the display label of a parsed entity."""
+    properties = entity.get('properties', {})
+    if entity.get('type') == 'WorkExperience' and properties.get('title') and properties.get('company'):
+        return f"{properties['title']} @ {properties['company']}"
+    for key in ('name', 'title', 'company', 'institution', 'degree'):
+        if properties.get(key):
+            return properties[key]
+    return next(iter(properties.values()), entity.get('type', ''))
+
+def entity_key(entity: Dict, resume: int) -> Tuple:
+    """Identity used to merge entities: skills across resumes, everything else within one."""
+    properties = entity.get('properties', {})
+    if entity['type'] == 'WorkExperience':
+        identity = tuple(properties.get(key, '').strip().lower() for key in ('company', 'title'))
+    else:
+        identity = (entity_label(entity).strip().lower(),)
+    if entity['type'] in SHARED_TYPES:
+        return (entity['type'],) + identity
+    return (resume, entity['type']) + identity
+
+def build_graph(graphs: List[Tuple[List[Dict], List[Dict]]]) -> Tuple[List[Dict], np.ndarray, List[str]]:
+    """Merge KnowledgeGraphParser outputs into one node list and edge array.
+
+    Skills with the same type and label are merged across resumes; other
+    entities are only merged within their resume, work experience by
+    company and title. Relation endpoints are matched to entities of the
+    same resume by label or any property value.
+
+    Args:
+        graphs (List[Tuple[List[Dict], List[Dict]]]): (entities, relations) per resume
+
+    Returns:
+        Tuple[List[Dict], np.ndarray, List[str]]: Nodes, an (m, 2) array of node
+        indices and the relationship type of each edge
+    """
+    nodes = []
+    node_index: Dict[Tuple, int] = {}
+    edges = []
+    edge_types = []
+
+    def add_node(key: Tuple, node_type: str, label: str) -> int:
+        if key not in node_index:
+            node_index[key] = len(nodes)
+            nodes.append({'id': len(nodes), 'type': node_type, 'label': label.strip()})
+        return node_index[key]
+
+    for resume, (entities, relations) in enumerate(graphs):
+        label_index: Dict[str, int] = {}
+        for entity in entities:
+            label = entity_label(entity)
+            node_id = add_node(entity_key(entity, resume), entity['type'], label)
+            label_index.setdefault(label.strip().lower(), node_id)
+            # Relations may name an entity by any of its properties
+            for value in entity.get('properties', {}).values():
+                if isinstance(value, str) and value.strip():
+                    label_index.setdefault(value.strip().lower(), node_id)
+
+        def endpoint(name: str) -> int:
+            node_id = label_index.get(name.strip().lower())
+            if node_id is None:
+                node_id = add_node((resume, 'Unknown', name.strip().lower()), 'Unknown', name)
+                label_index[name.strip().lower()] = node_id
+            return node_id
+
+        for relation in relations:
+            source, target = endpoint(relation['from']), endpoint(relation['to'])
+            if source != target:
+                edges.append((source, target))
+                edge_types.append(relation['type'])
+
+    for node in nodes:
+        node['degree'] = 0
+    for source, target in edges:
+        nodes[source]['degree'] += 1
+        nodes[target]['degree'] += 1
+
+    return nodes, np.array(edges, dtype=np.int64).reshape(-1, 2), edge_types
+
+def _block_rows(columns: int, memory_mb: float) -> int:
+    # Each pair holds a float64 delta (2 values), a distance and a weight
+    return max(1, int(memory_mb * 2 ** 20 // (columns * 4 * 8)))
+
+def _pairwise_repulsion(points: np.ndarray, sources: np.ndarray, weights: np.ndarray,
+                        k: float, memory_mb: float) -> np.ndarray:
+    """Repulsion on each point from weighted sources, computed in row blocks."""
+    displacement = np.zeros_like(points)
+    rows = _block_rows(len(sources), memory_mb)
+    for start in range(0, len(points), rows):
+        delta = points[start:start + rows, None, :] - sources[None, :, :]
+        distance = np.maximum(np.linalg.norm(delta, axis=2), 1e-4)
+        displacement[start:start + rows] = np.einsum('ijk,ij->ik', delta, weights * k * k / distance ** 2)
+    return displacement
+
+def _grid_repulsion(positions: np.ndarray, k: float, cells: int, memory_mb: float) -> np.ndarray:
+    """Approximate repulsion by binning nodes into a cells x cells grid.
+
+    Nodes in the same or an adjacent cell repel each other exactly; every
+    other cell acts on a node as a single source at its centroid, weighted by
+    its node count.
+    """
+    # The grid covers the central 98% of nodes; outliers fall into the edge cells
+    low, high = np.quantile(positions, [0.01, 0.99], axis=0)
+    span = np.maximum(high - low, 1e-9)
+    cell_xy = np.clip(((positions - low) / span * cells).astype(np.int64), 0, cells - 1)
+    cell_ids = cell_xy[:, 0] * cells + cell_xy[:, 1]
+
+    order = np.argsort(cell_ids, kind='stable')
+    occupied, starts, counts = np.unique(cell_ids[order], return_index=True, return_counts=True)
+    centroids = np.stack([np.bincount(cell_ids, weights=positions[:, axis], minlength=cells * cells)[occupied]
+                          for axis in (0, 1)], axis=1) / counts[:, None]
+    occupied_xy = np.stack([occupied // cells, occupied % cells], axis=1)
+
+    # Far field, per cell: centroids of all non-adjacent cells
+    far = np.zeros_like(centroids)
+    rows = _block_rows(len(occupied), memory_mb)
+    for start in range(0, len(occupied), rows):
+        block_xy = occupied_xy[start:start + rows]
+        adjacent = np.abs(block_xy[:, None, :] - occupied_xy[None, :, :]).max(axis=2) <= 1
+        delta = centroids[start:start + rows, None, :] - centroids[None, :, :]
+        distance = np.maximum(np.linalg.norm(delta, axis=2), 1e-4)
+        weights = np.where(adjacent, 0.0, counts[None, :] * k * k / distance ** 2)
+        far[start:start + rows] = np.einsum('ijk,ij->ik', delta, weights)
+
+    displacement = far[np.searchsorted(occupied, cell_ids)]
+
+    # Near field, per cell: exact repulsion from nodes in the 3 x 3 neighbourhood
+    slot = {cell: i for i, cell in enumerate(occupied.tolist())}
+    for i, cell in enumerate(occupied.tolist()):
+        x, y = divmod(cell, cells)
+        members = order[starts[i]:starts[i] + counts[i]]
+        neighbours = [slot.get((x + dx) * cells + y + dy)
+                      for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                      if 0 <= x + dx < cells and 0 <= y + dy < cells]
+        sources = np.concatenate([order[starts[j]:starts[j] + counts[j]] for j in neighbours if j is not None])
+        displacement[members] += _pairwise_repulsion(positions[members], positions[sources],
+                                                     np.ones(len(sources)), k, memory_mb)
+    return displacement
+
+def force_layout(node_count: int, edges: np.ndarray, iterations: int = 100, seed: int = 0,
+                 exact_limit: int = 2000, memory_mb: float = 256) -> np.ndarray:
+    """Vectorized Fruchterman-Reingold layout normalized to the unit square.
+
+    Up to exact_limit nodes, repulsion is computed exactly for every pair,
+    O(n^2) per iteration. Larger graphs bin nodes into a grid of about
+    n^(1/3) cells per axis and use cell centroids for distant nodes, which
+    is about O(n^(4/3)) per iteration while nodes are spread out. Pairwise
+    blocks are sized so each holds at most memory_mb of temporaries; a single
+    neighbourhood denser than that budget is still computed in row blocks.
+
+    Args:
+        node_count (int): Number of nodes
+        edges (np.ndarray): (m, 2) node indices
+        iterations (int): Number of cooling steps
+        seed (int): Random seed for the initial positions
+        exact_limit (int): Largest graph laid out with exact repulsion
+        memory_mb (float): Memory budget of one pairwise repulsion block
+
+    Returns:
+        np.ndarray: (n, 2) float32 positions in [0, 1]
+    """
+    if node_count == 0:
+        return np.zeros((0, 2), dtype=np.float32)
+
+    rng = np.random.default_rng(seed)
+    positions = rng.random((node_count, 2))
+    k = np.sqrt(1.0 / node_count)
+    temperature = 0.1
+    cells = int(np.ceil(node_count ** (1 / 3)))
+
+    for _ in range(iterations):
+        if node_count <= exact_limit:
+            displacement = _pairwise_repulsion(positions, positions, np.ones(node_count), k, memory_mb)
+        else:
+            displacement = _grid_repulsion(positions, k, cells, memory_mb)
+
+        if len(edges):
+            delta = positions[edges[:, 0]] - positions[edges[:, 1]]
+            distance = np.maximum(np.linalg.norm(delta, axis=1), 1e-4)
+            force = delta * (distance / k)[:, None]
+            np.add.at(displacement, edges[:, 0], -force)
+            np.add.at(displacement, edges[:, 1], force)
+
+        length = np.maximum(np.linalg.norm(displacement, axis=1), 1e-9)
+        positions += displacement / length[:, None] * np.minimum(length, temperature)[:, None]
+        temperature *= 0.95
+
+    low, high = positions.min(axis=0), positions.max(axis=0)
+    span = np.where(high - low > 0, high - low, 1.0)
+    return ((positions - low) / span).astype(np.float32)
+
+def cluster_level(positions: np.ndarray, node_types: np.ndarray, edges: np.ndarray,
+                  cells: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Group nodes into a cells x cells grid for a coarse level of detail.
+
+    Args:
+        positions (np.ndarray): (n, 2) positions in [0, 1]
+        node_types (np.ndarray): (n,) type index per node
+        edges (np.ndarray): (m, 2) node indices
+        cells (int): Grid cells per axis
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Cluster rows [x, y, count, type],
+        cluster id per node and aggregated edges [source, target, weight]
+    """
+    cell = np.minimum((positions * cells).astype(np.int64), cells - 1)
+    cell_ids = cell[:, 1] * cells + cell[:, 0]
+    unique_cells, node_cluster = np.unique(cell_ids, return_inverse=True)
+    cluster_count = len(unique_cells)
+
+    counts = np.bincount(node_cluster, minlength=cluster_count)
+    centroid_x = np.bincount(node_cluster, weights=positions[:, 0], minlength=cluster_count) / counts
+    centroid_y = np.bincount(node_cluster, weights=positions[:, 1], minlength=cluster_count) / counts
+
+    # Dominant node type per cluster
+    type_count = int(node_types.max()) + 1 if len(node_types) else 1
+    type_histogram = np.zeros((cluster_count, type_count), dtype=np.int64)
+    np.add.at(type_histogram, (node_cluster, node_types), 1)
+    dominant_type = type_histogram.argmax(axis=1)
+
+    clusters = np.column_stack([centroid_x, centroid_y, counts, dominant_type])
+
+    cluster_edges = np.zeros((0, 3), dtype=np.int64)
+    if len(edges):
+        pairs = np.sort(node_cluster[edges], axis=1)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        if len(pairs):
+            unique_pairs, weights = np.unique(pairs, axis=0, return_counts=True)
+            cluster_edges = np.column_stack([unique_pairs, weights])
+
+    return clusters, node_cluster, cluster_edges
+
+def _tile_of(positions: np.ndarray, tiles: int) -> np.ndarray:
+    tile = np.minimum((positions * tiles).astype(np.int64), tiles - 1)
+    return tile[:, 1] * tiles + tile[:, 0]
+
+def _write_json(path: str, data) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+
+def _point(positions: np.ndarray, index: int) -> List[float]:
+    return [round(float(positions[index, 0]), 5), round(float(positions[index, 1]), 5)]
+
+def export_graph(nodes: List[Dict], edges: np.ndarray, relationships: List[str], output_dir: str,
+                 max_zoom: int = 3, cells_per_tile: int = 8, iterations: int = 100) -> Dict:
+    """Lay out a graph and write a tiled, level-of-detail payload for the graph UI.
+
+    Writes manifest.json and tiles/<z>/<x>_<y>.json. Every tile is
+    self-contained, so the browser only downloads what is in view: zoom
+    levels below max_zoom hold grid clusters, max_zoom holds individual
+    nodes with their positions and labels. Edges carry the coordinates of
+    both endpoints so edges leaving a tile can be drawn without its
+    neighbours.
+
+    Args:
+        nodes (List[Dict]): Nodes from build_graph
+        edges (np.ndarray): Edge array from build_graph
+        relationships (List[str]): Relationship type of each edge
+        output_dir (str): Directory receiving the payload
+        max_zoom (int): Deepest zoom level, tiled 2**max_zoom per axis
+        cells_per_tile (int): Cluster grid cells per tile axis at coarse levels
+        iterations (int): Layout iterations
+
+    Returns:
+        Dict: The manifest
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    positions = force_layout(len(nodes), edges, iterations)
+
+    relation_types = sorted(set(relationships))
+    relation_ids = np.array([relation_types.index(r) for r in relationships], dtype=np.int64)
+    types = sorted({node['type'] for node in nodes})
+    type_ids = {name: i for i, name in enumerate(types)}
+    node_types = np.array([type_ids[node['type']] for node in nodes], dtype=np.int64)
+
+    tile_counts = {}
+    for zoom in range(max_zoom + 1):
+        tiles = 2 ** zoom
+        if zoom < max_zoom:
+            clusters, _, cluster_edges = cluster_level(positions, node_types, edges, tiles * cells_per_tile)
+            centroids = clusters[:, :2]
+            cluster_tiles = _tile_of(centroids, tiles)
+            for tile_id in np.unique(cluster_tiles):
+                in_tile = np.flatnonzero(cluster_tiles == tile_id)
+                tile_edges = cluster_edges[np.isin(cluster_edges[:, 0], in_tile) |
+                                           np.isin(cluster_edges[:, 1], in_tile)]
+                x, y = int(tile_id % tiles), int(tile_id // tiles)
+                _write_json(os.path.join(output_dir, 'tiles', str(zoom), f'{x}_{y}.json'), {
+                    # [id, x, y, node count, dominant type]
+                    'clusters': [[int(i)] + _point(centroids, i) + [int(clusters[i, 2]), int(clusters[i, 3])]
+                                 for i in in_tile],
+                    # [source, target, weight, source x, source y, target x, target y]
+                    'edges': [[int(a), int(b), int(w)] + _point(centroids, a) + _point(centroids, b)
+                              for a, b, w in tile_edges],
+                })
+                tile_counts[f'{zoom}/{x}/{y}'] = len(in_tile)
+        else:
+            node_tiles = _tile_of(positions, tiles)
+            for tile_id in np.unique(node_tiles):
+                in_tile = np.flatnonzero(node_tiles == tile_id)
+                edge_mask = np.isin(edges[:, 0], in_tile) | np.isin(edges[:, 1], in_tile)
+                x, y = int(tile_id % tiles), int(tile_id // tiles)
+                _write_json(os.path.join(output_dir, 'tiles', str(zoom), f'{x}_{y}.json'), {
+                    # [id, x, y, type, degree, label]
+                    'nodes': [[int(i)] + _point(positions, i) +
+                              [int(node_types[i]), nodes[i]['degree'], nodes[i]['label']]
+                              for i in in_tile],
+                    # [source, target, relation type, source x, source y, target x, target y]
+                    'edges': [[int(a), int(b), int(r)] + _point(positions, a) + _point(positions, b)
+                              for (a, b), r in zip(edges[edge_mask], relation_ids[edge_mask])],
+                })
+                tile_counts[f'{zoom}/{x}/{y}'] = len(in_tile)
+
+    manifest = {
+        'version': 2,
+        'node_count': len(nodes),
+        'edge_count': int(len(edges)),
+        'node_types': types,
+        'relation_types': relation_types,
+        'max_zoom': max_zoom,
+        'cells_per_tile': cells_per_tile,
+        'tiles': tile_counts,
+    }
+    _write_json(os.path.join(output_dir, 'manifest.json'), manifest)
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description='Export knowledge graphs for the graph UI')
+    parser.add_argument('graphs', nargs='+', help='JSON files or graph artifacts with entities and relations')
+    parser.add_argument('--output', default='graph_export', help='Output directory')
+    parser.add_argument('--max-zoom', type=int, default=3)
+    args = parser.parse_args()
+
+    graphs = []
+    for path in args.graphs:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        # Accept plain graph files as well as graph artifacts from ArtifactPipeline
+        data = data.get('value', data)
+        graphs.append((data['entities'], data['relations']))
+
+    nodes, edges, relationships = build_graph(graphs)
+    manifest = export_graph(nodes, edges, relationships, args.output, args.max_zoom)
+    print(f"Exported {manifest['node_count']} nodes, {manifest['edge_count']} edges "
+          f"in {len(manifest['tiles'])} tiles to {args.output}")
+
+if __name__ == '__main__':
+    main()
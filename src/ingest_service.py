@@ -0,0 +1,318 @@
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from ollama_session import OllamaSession
+from pdf_processor import PDFProcessor
+from dedup import DeduplicatingProcessor, DuplicateIndex
+from xml_processor import XMLProcessor
+from xml_merger import XMLMerger
+from run_log import default_run_log
+
+class JobQueue:
+    STATES = ('pending', 'running', 'done', 'failed')
+
+    def __init__(self, queue_dir: str = None, retention_days: Optional[float] = 7):
+        """Initialize a durable on-disk job queue.
+
+        Each job is a JSON file that moves between state directories with
+        atomic renames, so queued work survives a restart.
+
+        Args:
+            queue_dir (str, optional): Root directory of the queue
+            retention_days (Optional[float]): Delete finished jobs older than this, None keeps all
+        """
+        self.queue_dir = queue_dir or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'ingest_queue')
+        self.upload_dir = os.path.join(self.queue_dir, 'uploads')
+        for state in self.STATES:
+            os.makedirs(os.path.join(self.queue_dir, state), exist_ok=True)
+        os.makedirs(self.upload_dir, exist_ok=True)
+        self.retention_days = retention_days
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+
+    def _path(self, state: str, job_id: str) -> str:
+        return os.path.join(self.queue_dir, state, f'{job_id}.json')
+
+    def _write(self, state: str, job: Dict) -> None:
+        path = self._path(state, job['id'])
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def recover(self) -> int:
+        """Requeue jobs left running by a previous process. Returns the count."""
+        with self._lock:
+            paths = glob.glob(os.path.join(self.queue_dir, 'running', '*.json'))
+            for path in paths:
+                os.replace(path, os.path.join(self.queue_dir, 'pending', os.path.basename(path)))
+            return len(paths)
+
+    def submit(self, pdf_bytes: bytes, filename: str) -> Dict:
+        """Store an uploaded PDF and queue it for processing."""
+        job_id = uuid.uuid4().hex
+        # One scratch directory per job, since page images are rendered next to
+        # the PDF; the client's filename is only kept as metadata
+        job_dir = os.path.join(self.upload_dir, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        pdf_path = os.path.join(job_dir, 'upload.pdf')
+        with open(pdf_path, 'wb') as f:
+            f.write(pdf_bytes)
+
+        now = datetime.now().isoformat()
+        job = {'id': job_id, 'status': 'pending', 'filename': filename, 'pdf_path': pdf_path,
+               'created': now, 'updated': now}
+        with self._available:
+            self._write('pending', job)
+            self._available.notify()
+        return job
+
+    def claim(self, timeout: float = 1.0) -> Optional[Dict]:
+        """Move the oldest pending job to running, waiting up to timeout for one."""
+        with self._available:
+            paths = glob.glob(os.path.join(self.queue_dir, 'pending', '*.json'))
+            if not paths:
+                self._available.wait(timeout)
+                paths = glob.glob(os.path.join(self.queue_dir, 'pending', '*.json'))
+            if not paths:
+                return None
+
+            path = min(paths, key=os.path.getmtime)
+            with open(path, 'r', encoding='utf-8') as f:
+                job = json.load(f)
+            job['status'] = 'running'
+            job['updated'] = datetime.now().isoformat()
+            self._write('running', job)
+            os.remove(path)
+            return job
+
+    def finish(self, job: Dict, result: Dict = None, error: str = None) -> None:
+        """Record a job's result or error, remove it from running and delete its upload and page images."""
+        job['status'] = 'failed' if error else 'done'
+        job['updated'] = datetime.now().isoformat()
+        if error:
+            job['error'] = error
+        else:
+            job['result'] = result
+        with self._lock:
+            self._write(job['status'], job)
+            os.remove(self._path('running', job['id']))
+        shutil.rmtree(os.path.join(self.upload_dir, job['id']), ignore_errors=True)
+
+    def prune(self) -> int:
+        """Delete finished jobs older than the retention period. Returns the count."""
+        if self.retention_days is None:
+            return 0
+
+        cutoff = time.time() - self.retention_days * 86400
+        removed = 0
+        with self._lock:
+            for state in ('done', 'failed'):
+                for path in glob.glob(os.path.join(self.queue_dir, state, '*.json')):
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+        return removed
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        # Reads take no lock, so a job can move to a later state between
+        # checks; a second pass finds it there
+        for _ in range(2):
+            for state in self.STATES:
+                try:
+                    with open(self._path(state, job_id), 'r', encoding='utf-8') as f:
+                        return json.load(f)
+                except FileNotFoundError:
+                    continue
+        return None
+
+    def counts(self) -> Dict[str, int]:
+        counts = {state: len(glob.glob(os.path.join(self.queue_dir, state, '*.json')))
+                  for state in ('pending', 'running')}
+        counts['outstanding'] = counts['pending'] + counts['running']
+        return counts
+
+class WorkerPool:
+    def __init__(self, queue: JobQueue, workers: int = 2, model_name: str = 'llama3.2-vision',
+                 keep_alive: str = '30m', deduplicate: bool = True):
+        """Initialize long-lived workers that share a run log and an Ollama session.
+
+        Args:
+            queue (JobQueue): Queue to consume
+            workers (int): Number of worker threads
+            model_name (str): Vision model used by the workers
+            keep_alive (str): How long Ollama keeps the model loaded after a request
+            deduplicate (bool): Reuse page outputs from near-duplicate uploads
+        """
+        self.queue = queue
+        self.model_name = model_name
+        self.keep_alive = keep_alive
+        self.run_log = default_run_log()
+        template = PDFProcessor(model_name=model_name, run_log=self.run_log)
+        self.session = OllamaSession(model_name, template.get_system_prompt(), keep_alive,
+                                     {'num_ctx': template.context_budget})
+        self.duplicate_index = DuplicateIndex() if deduplicate else None
+        self._last_prune = 0.0
+        self._prune_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = [threading.Thread(target=self._work, name=f'ingest-worker-{i}', daemon=True)
+                         for i in range(workers)]
+
+    def warm_up(self) -> None:
+        """Load the model and prefill the system prompt so the first upload does not pay the cold start."""
+        self.session.warm_up()
+
+    def start(self) -> None:
+        self.warm_up()
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self.run_log.close()
+        self.session.print_report()
+
+    def _work(self) -> None:
+        pdf_processor = PDFProcessor(model_name=self.model_name, run_log=self.run_log, session=self.session)
+        if self.duplicate_index is not None:
+            pdf_processor = DeduplicatingProcessor(pdf_processor, self.duplicate_index)
+        xml_processor = XMLProcessor()
+        merger = XMLMerger()
+
+        while not self._stop.is_set():
+            job = self.queue.claim()
+            if job is None:
+                self._prune_when_idle()
+                continue
+
+            try:
+                # Every upload is stored as upload.pdf, so log it under its job id
+                pages = pdf_processor.process_pdf(job['pdf_path'], document=job['id'])
+                merged_xml = merger.merge_documents(pages)
+                tags = xml_processor.extract_tags(merged_xml) if merged_xml else []
+                self.queue.finish(job, {'pages': pages, 'xml': merged_xml, 'tags': tags})
+            except Exception as e:
+                print(f"Error processing job {job['id']}: {e}")
+                self.queue.finish(job, error=str(e))
+
+    def _prune_when_idle(self, interval: float = 3600) -> None:
+        with self._prune_lock:
+            if time.time() - self._last_prune < interval:
+                return
+            self._last_prune = time.time()
+        self.queue.prune()
+
+def make_handler(queue: JobQueue, max_outstanding: int, max_upload_bytes: int,
+                 session: Optional[OllamaSession] = None):
+    job_path = re.compile(r'^/jobs/([0-9a-f]{32})(/result)?$')
+
+    class IngestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, body: Dict, headers: Dict[str, str] = None) -> None:
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            if self.path.split('?')[0] != '/jobs':
+                return self._send_json(404, {'error': 'not found'})
+
+            counts = queue.counts()
+            if counts['outstanding'] >= max_outstanding:
+                return self._send_json(503, {'error': 'queue full', **counts}, {'Retry-After': '30'})
+
+            length = int(self.headers.get('Content-Length', 0))
+            if length <= 0 or length > max_upload_bytes:
+                return self._send_json(413 if length else 400, {'error': 'invalid upload size'})
+
+            pdf_bytes = self.rfile.read(length)
+            if not pdf_bytes.startswith(b'%PDF'):
+                return self._send_json(415, {'error': 'expected a PDF body'})
+
+            filename = os.path.basename(self.headers.get('X-Filename', '').replace('\\', '/'))
+            if filename in ('', '.', '..'):
+                filename = 'upload.pdf'
+            job = queue.submit(pdf_bytes, filename)
+            self._send_json(202, {'job_id': job['id'], 'status': job['status'],
+                                  'outstanding': counts['outstanding'] + 1})
+
+        def do_GET(self):
+            if self.path == '/queue':
+                body = {**queue.counts(), 'max_outstanding': max_outstanding}
+                if session is not None:
+                    body['model'] = session.report()
+                return self._send_json(200, body)
+
+            match = job_path.match(self.path)
+            if not match:
+                return self._send_json(404, {'error': 'not found'})
+
+            job = queue.get(match.group(1))
+            if job is None:
+                return self._send_json(404, {'error': 'unknown job'})
+
+            if match.group(2):
+                if job['status'] == 'done':
+                    return self._send_json(200, {'job_id': job['id'], 'result': job['result']})
+                if job['status'] == 'failed':
+                    return self._send_json(500, {'job_id': job['id'], 'error': job['error']})
+                return self._send_json(409, {'job_id': job['id'], 'status': job['status']})
+
+            status = {key: value for key, value in job.items() if key not in ('result', 'pdf_path')}
+            self._send_json(200, status)
+
+        def log_message(self, format, *args):
+            pass
+
+    return IngestHandler
+
+def main():
+    parser = argparse.ArgumentParser(description='Local resume ingestion service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--model', default='llama3.2-vision')
+    parser.add_argument('--queue-dir', help='Directory of the on-disk job queue')
+    parser.add_argument('--max-outstanding', type=int, default=100, help='Reject uploads beyond this backlog')
+    parser.add_argument('--max-upload-mb', type=int, default=20)
+    parser.add_argument('--no-dedup', action='store_true', help='Process every upload from scratch')
+    args = parser.parse_args()
+
+    queue = JobQueue(args.queue_dir)
+    recovered = queue.recover()
+    if recovered:
+        print(f'Requeued {recovered} interrupted jobs')
+
+    pool = WorkerPool(queue, args.workers, args.model, deduplicate=not args.no_dedup)
+    pool.start()
+
+    handler = make_handler(queue, args.max_outstanding, args.max_upload_mb * 1024 * 1024, pool.session)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f'Listening on http://{args.host}:{args.port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.stop()
+
+if __name__ == '__main__':
+    main()
@@ -1,39 +1,46 @@
-import os
 import xml.etree.ElementTree as ET
-import ollama
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import re
-from datetime import datetime
-import json
+from run_log import RunLog, default_run_log
+from model_cascade import ModelCascade
+from xml_merger import XMLMerger
+
+GRAPH_PARSER_VERSION = '1'
 
 class KnowledgeGraphParser:
-    def __init__(self, model_name: str = 'llama3.2-vision'):
+    def __init__(self, model_name: str = 'llama3.2-vision', run_log: Optional[RunLog] = None,
+                 verbose: bool = False, cascade: Optional[ModelCascade] = None, session=None,
+                 keep_alive: str = '30m', context_budget: int = 8192):
         self.model_name = model_name
-        self.output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'llama_outputs')
-        os.makedirs(self.output_dir, exist_ok=True)
-
-    def save_llama_output(self, prompt: str, response: str) -> str:
-        """Save LLaMA prompt and response to a timestamped file."""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'llama_output_{timestamp}.txt'
-        filepath = os.path.join(self.output_dir, filename)
-        
-        output_data = {
-            'timestamp': datetime.now().isoformat(),
-            'prompt': prompt,
-            'response': response
-        }
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write("=== LLaMA Output ===\n")
-            f.write(f"Timestamp: {output_data['timestamp']}\n\n")
-            f.write("=== Prompt ===\n")
-            f.write(f"{output_data['prompt']}\n\n")
-            f.write("=== Response ===\n")
-            f.write(f"{output_data['response']}\n")
-        
-        print(f"\nLLaMA output saved to: {filepath}")
-        return filepath
+        # Matches PDFProcessor so sharing a model with extraction does not reload it
+        self.context_budget = context_budget
+        self.cascade = cascade
+        self._run_log = run_log
+        self._session = session
+        self.keep_alive = keep_alive
+        self.verbose = verbose
+
+    @property
+    def run_log(self) -> RunLog:
+        """Run log for model calls, created on first use so parse-only callers stay cheap."""
+        if self._run_log is None:
+            self._run_log = default_run_log()
+        return self._run_log
+
+    @property
+    def session(self):
+        """Ollama session sharing the analysis instructions across calls, created on first use."""
+        if self._session is None:
+            from ollama_session import OllamaSession  # Imported lazily so parse-only callers do not load the client
+            self._session = OllamaSession(self.model_name, self.get_system_prompt(), self.keep_alive,
+                                          {'num_ctx': self.context_budget})
+        return self._session
+
+    def save_llama_output(self, prompt: str, response: str, document: str = None,
+                          model_name: str = None, **metadata) -> str:
+        """Append LLaMA prompt and response to the run log and return the record id."""
+        return self.run_log.log('graph_analysis', prompt, response, model=model_name or self.model_name,
+                                document=document, **metadata)
 
     def get_graph_schema(self) -> str:
         """Generate the knowledge graph schema description for LLaMA context"""
@@ -72,22 +79,19 @@ class KnowledgeGraphParser:
         """
         return schema
 
-    def enhance_xml_prompt(self, xml_content: str) -> str:
-        """Add knowledge graph context to the XML content for better parsing"""
+    def get_system_prompt(self) -> str:
+        """Fixed analysis instructions, sent ahead of every resume so the prefix is reused"""
         schema = self.get_graph_schema()
         prompt = f"""
         Using the following knowledge graph schema:
 
         {schema}
 
-        Please analyze this XML resume data and identify:
+        Please analyze the XML resume data that follows and identify:
         1. Clear entity instances that match our schema
         2. Relationships between these entities
         3. Any implicit connections that should be made explicit
 
-        Resume Data:
-        {xml_content}
-
         Please provide your analysis in a structured format that identifies:
         1. All entities found (with their properties)
         2. All relationships between entities
@@ -96,29 +100,37 @@ class KnowledgeGraphParser:
 
         return prompt
 
-    def analyze_xml_with_llama(self, xml_content: str) -> str:
+    def get_resume_payload(self, xml_content: str) -> str:
+        """Variable part of an analysis request"""
+        return f"Resume Data:\n{xml_content}"
+
+    def enhance_xml_prompt(self, xml_content: str) -> str:
+        """Add knowledge graph context to the XML content for better parsing"""
+        return self.get_system_prompt() + '\n' + self.get_resume_payload(xml_content)
+
+    def analyze_xml_with_llama(self, xml_content: str, document: str = None) -> str:
         """Use LLaMA to analyze the XML content with knowledge graph context"""
-        prompt = self.enhance_xml_prompt(xml_content)
-        
+        payload = self.get_resume_payload(xml_content)
+
+        def chat(model_name: str) -> str:
+            return self.session.chat(payload, model_name=model_name)
+
         try:
-            response = ollama.chat(
-                model=self.model_name,
-                messages=[{
-                    'role': 'user',
-                    'content': prompt
-                }]
-            )
+            if self.cascade:
+                content, model_name = self.cascade.run(chat, self.score_analysis)
+            else:
+                content = chat(self.model_name)
+                model_name = self.model_name
             
-            content = response['message']['content']
-            
-            # Save the output
-            self.save_llama_output(prompt, content)
+            # Only the fixed instructions are stored by hash; the resume goes in the record
+            self.save_llama_output(self.get_system_prompt(), content, document, model_name, payload=payload)
             
             # Print raw LLaMA output for debugging
-            print("\nRaw LLaMA Output:")
-            print("-" * 80)
-            print(content)
-            print("-" * 80)
+            if self.verbose:
+                print("\nRaw LLaMA Output:")
+                print("-" * 80)
+                print(content)
+                print("-" * 80)
             
             return content
             
@@ -128,6 +140,29 @@ class KnowledgeGraphParser:
 
     def extract_entities_and_relations(self, llama_analysis: str) -> Tuple[List[Dict], List[Dict]]:
         """Extract entities and relations from LLaMA's analysis"""
+        entities, relations = self._parse_analysis(llama_analysis)
+
+        # Print parsed results for verification
+        if self.verbose:
+            print("\nParsed Entities:")
+            for entity in entities:
+                print(f"\nEntity Type: {entity['type']}")
+                print("Properties:")
+                for key, value in entity['properties'].items():
+                    print(f"  {key}: {value}")
+
+            print("\nParsed Relations:")
+            for relation in relations:
+                print(f"\n{relation['from']} --{relation['type']}--> {relation['to']}")
+
+        return entities, relations
+
+    def score_analysis(self, llama_analysis: str) -> float:
+        """Cheaply score an analysis: 1 with entities and relations, 0.5 with only one of them"""
+        entities, relations = self._parse_analysis(llama_analysis)
+        return (bool(entities) + bool(relations)) / 2
+
+    def _parse_analysis(self, llama_analysis: str) -> Tuple[List[Dict], List[Dict]]:
         entities = []
         relations = []
 
@@ -186,25 +221,13 @@ class KnowledgeGraphParser:
                         'type': relation_type.strip()
                     })
 
-        # Print parsed results for verification
-        print("\nParsed Entities:")
-        for entity in entities:
-            print(f"\nEntity Type: {entity['type']}")
-            print("Properties:")
-            for key, value in entity['properties'].items():
-                print(f"  {key}: {value}")
-
-        print("\nParsed Relations:")
-        for relation in relations:
-            print(f"\n{relation['from']} --{relation['type']}--> {relation['to']}")
-
         return entities, relations
 
-    def create_knowledge_graph(self, xml_content: str) -> Tuple[List[Dict], List[Dict]]:
+    def create_knowledge_graph(self, xml_content: str, document: str = None) -> Tuple[List[Dict], List[Dict]]:
         """Create a knowledge graph from XML resume content"""
         try:
             # Get LLaMA's analysis with knowledge graph context
-            analysis = self.analyze_xml_with_llama(xml_content)
+            analysis = self.analyze_xml_with_llama(xml_content, document)
             
             # Extract entities and relations
             entities, relations = self.extract_entities_and_relations(analysis)
@@ -215,6 +238,15 @@ class KnowledgeGraphParser:
             print(f'Error creating knowledge graph: {e}')
             raise
 
+    def create_document_knowledge_graph(self, pages: List[str], document: str = None) -> Tuple[List[Dict], List[Dict]]:
+        """Merge per-page XML into one document and create its knowledge graph once"""
+        merged_xml = XMLMerger().merge_documents(pages)
+        if merged_xml is None:
+            print('No valid XML content found in any page')
+            return [], []
+
+        return self.create_knowledge_graph(merged_xml, document)
+
 def main():
     # Example usage
     xml_content = """<?xml version="1.0" encoding="UTF-8"?>
@@ -233,7 +265,7 @@ def main():
     </resume>
     """
     
-    parser = KnowledgeGraphParser()
+    parser = KnowledgeGraphParser(verbose=True)
     
     try:
         entities, relations = parser.create_knowledge_graph(xml_content)
@@ -1,3 +1,5 @@
+from typing import Dict, List
+
 def get_resume_xml_prompt() -> str:
     """Get the structured XML prompt for resume analysis."""
     return """
@@ -91,3 +93,43 @@ Please verify the following for the generated XML:
 5. Impact metrics are quantified where possible
 
 If any issues are found, please regenerate the XML with corrections."""
+
+def get_repair_prompt(xml_content: str, issues: List[Dict]) -> str:
+    """Get a targeted prompt to fix the issues found by local validation."""
+    issue_lines = "\n".join(f"{i}. {issue['path']}: {issue['message']}"
+                            for i, issue in enumerate(issues, 1))
+    return f"""
+The following XML was extracted from this resume image but failed validation:
+
+{xml_content}
+
+Fix only these issues, using the resume image to fill in missing information:
+{issue_lines}
+
+Keep every other tag, attribute and value unchanged. Use YYYY-MM for dates.
+Do not invent values that are not visible in the image; leave them empty instead.
+Return the complete corrected <resume> XML and nothing else."""
+
+def get_compact_resume_prompt() -> str:
+    """Get a terse XML prompt that keeps generated tokens to a minimum."""
+    return """
+Analyze this resume and extract it in this compact XML. Use attributes exactly as shown and omit anything not found:
+
+<r>
+<h n="name" t="title">summary</h>
+<ts><s n="skill" p="e|a|i|b" c="context"/></ts>
+<ss><s n="skill" d="where demonstrated"/></ss>
+<x>
+<p c="company" t="title" s="YYYY-MM" e="YYYY-MM|Present">
+<i>responsibility</i>
+<a m="impact" k="tech;tech">achievement</a>
+</p>
+</x>
+<ed><d l="Bachelor|Master|PhD" f="field" u="institution" st="completed|ongoing|expected" dt="YYYY-MM" k="course;course"/></ed>
+<ce><c n="name" i="issuer" dt="YYYY-MM" st="active|expired"/></ce>
+<pj><j n="name" k="tech;tech" o="outcome">description</j></pj>
+</r>
+
+Key: h=header, ts/ss=technical/soft skills with p=proficiency (expert/advanced/intermediate/beginner),
+x=experience of <p> positions, i=responsibility, a=achievement, ed=education, ce=certifications, pj=projects.
+Repeat elements as needed. Output only the XML."""
@@ -1,38 +1,83 @@
 import os
+from typing import Optional
 # PDFProcessor: Input: PDF file path (str) -> Output: List[str] of LLaMA responses with XML tags
 from pdf_processor import PDFProcessor
 # XMLProcessor: Input: LLaMA response text (str) -> Output: List[Dict] of structured tag data
 from xml_processor import XMLProcessor
+# XMLMerger: Input: List[str] of per-page LLaMA responses -> Output: merged <resume> XML (str)
+from xml_merger import XMLMerger
+# ModelCascade: routes each call through cheaper models first, escalating on low scores
+from model_cascade import ModelCascade, DEFAULT_VISION_TIERS
+# XMLValidator: Input: LLaMA response text (str) -> Output: List[Dict] of schema issues
+from xml_validator import XMLValidator, STRUCTURED_XML_SPEC
+# DeduplicatingProcessor: Input: PDF file path (str) -> Output: List[str], reusing pages of near-duplicates
+from dedup import DeduplicatingProcessor
 
-def process_resume(pdf_path: str, save_images: bool = False) -> None:
+def process_resume(pdf_path: str, save_images: bool = False, pack_pages: bool = False,
+                   use_cascade: bool = False, validate: bool = False,
+                   deduplicate: bool = False) -> Optional[str]:
     """Process a resume PDF and extract structured information.
 
     Args:
         pdf_path (str): Path to the PDF file
         save_images (bool): Whether to save intermediate images
+        pack_pages (bool): Send several pages per model request when they fit
+        use_cascade (bool): Try a small vision model first and escalate low-quality pages
+        validate (bool): Validate each page locally and re-prompt only pages with errors
+        deduplicate (bool): Reuse page outputs from a near-duplicate resume processed before
+            (pages are not packed in this mode)
+
+    Returns:
+        Optional[str]: Merged resume XML, or None if no valid XML was produced
     """
     try:
         # Initialize processors
-        pdf_processor = PDFProcessor()
+        cascade = ModelCascade(DEFAULT_VISION_TIERS) if use_cascade else None
+        validator = XMLValidator(STRUCTURED_XML_SPEC) if validate else None
+        pdf_processor = PDFProcessor(cascade=cascade, validator=validator)
         xml_processor = XMLProcessor()
+
+        # Load the model and prefill the fixed instructions before the first page
+        pdf_processor.warm_up()
         
         # Process PDF and get LLaMA output
         print("Processing PDF...")
-        results = pdf_processor.process_pdf(pdf_path, save_images)
+        if deduplicate:
+            deduplicator = DeduplicatingProcessor(pdf_processor)
+            results = deduplicator.process_pdf(pdf_path, save_images)
+            print(f"Deduplication: {deduplicator.stats}")
+        else:
+            results = pdf_processor.process_pdf(pdf_path, save_images, pack_pages)
         
-        # Process each page's XML content
-        for i, content in enumerate(results, 1):
-            print(f"\nAnalyzing page {i}:")
-            xml_content = xml_processor.extract_xml_from_text(content)
-            
+        # Merge the pages into one document and analyze it once
+        print("\nAnalyzing merged document:")
+        xml_content = XMLMerger().merge_documents(results)
+        
+        if xml_content:
+            tags = xml_processor.extract_tags(xml_content)
+            xml_processor.format_tag_output(tags)
+        else:
+            print("No valid XML content found in LLaMA output")
+
+        if cascade:
+            print("\nModel cascade:")
+            cascade.print_report()
+
+        if validator:
+            print(f"\nValidation: {pdf_processor.validation_stats}")
+            # Required sections and filled fields only make sense for the whole resume
             if xml_content:
-                tags = xml_processor.extract_tags(xml_content)
-                xml_processor.format_tag_output(tags)
-            else:
-                print("No valid XML content found in LLaMA output")
+                for issue in validator.validate(xml_content):
+                    print(f"  {issue['severity']:8} {issue['code']:18} {issue['path']}: {issue['message']}")
+
+        print("\nModel load and prompt evaluation:")
+        pdf_processor.session.print_report()
+
+        return xml_content
                 
     except Exception as e:
         print(f'Error processing resume: {e}')
+        return None
 
 def main():
     # Example usage
@@ -0,0 +1,107 @@
+import re
+import threading
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Small, fast models first; the last tier is the fallback that is always accepted
+DEFAULT_VISION_TIERS = ['llava-phi3', 'llama3.2-vision']
+DEFAULT_TEXT_TIERS = ['llama3.2', 'llama3.2-vision']
+
+RESUME_PATTERN = re.compile(r'<resume[\s>][\s\S]*?</resume>')
+BARE_AMPERSAND_PATTERN = re.compile(r'&(?!\w+;|#\d+;|#x[0-9a-fA-F]+;)')
+
+def score_resume_xml(content: str, required_sections: Optional[Tuple[str, ...]] = None) -> float:
+    """Cheaply score a vision extraction between 0 and 1.
+
+    Malformed XML scores 0. A page only holds part of a resume, so by default
+    the score is the fraction of leaf fields filled in across the sections
+    that contain any text; empty template sections for content on other pages
+    are ignored. Pass required_sections when scoring a merged document to
+    also average in the fraction of those sections that are filled.
+
+    Args:
+        content (str): Raw LLaMA response
+        required_sections (Tuple[str, ...], optional): Sections expected on every resume
+
+    Returns:
+        float: Quality score
+    """
+    match = RESUME_PATTERN.search(content)
+    if not match:
+        return 0.0
+
+    try:
+        root = ET.fromstring(BARE_AMPERSAND_PATTERN.sub('&amp;', match.group(0)))
+    except ET.ParseError:
+        return 0.0
+
+    def is_filled(element: ET.Element) -> bool:
+        return bool((element.text or '').strip() or any(v.strip() for v in element.attrib.values()))
+
+    def has_text(element: ET.Element) -> bool:
+        return any(is_filled(e) for e in element.iter())
+
+    sections = [section for section in root if has_text(section)]
+    leaves = [e for section in sections for e in section.iter() if len(e) == 0]
+    field_score = sum(1 for e in leaves if is_filled(e)) / len(leaves) if leaves else 0.0
+
+    if not required_sections:
+        return field_score
+
+    required = [root.find(name) for name in required_sections]
+    section_score = sum(1 for s in required if s is not None and has_text(s)) / len(required_sections)
+    return (section_score + field_score) / 2
+
+class ModelCascade:
+    def __init__(self, models: List[str], threshold: float = 0.6):
+        """Initialize a cascade that escalates low-scoring outputs to larger models.
+
+        Args:
+            models (List[str]): Model names ordered from cheapest to most capable
+            threshold (float): Minimum score for accepting an output
+        """
+        self.models = models
+        self.threshold = threshold
+        self.stats = {model: {'calls': 0, 'accepted': 0} for model in models}
+        self._lock = threading.Lock()
+
+    def run(self, call: Callable[[str], str], score: Callable[[str], float]) -> Tuple[str, str]:
+        """Call each tier in order until an output scores above the threshold.
+
+        Args:
+            call (Callable[[str], str]): Makes the request with the given model
+            score (Callable[[str], float]): Scores a response between 0 and 1
+
+        Returns:
+            Tuple[str, str]: First accepted response, or the last tier's response, and the
+            model that produced it
+        """
+        for i, model in enumerate(self.models):
+            response = call(model)
+            accepted = i == len(self.models) - 1 or score(response) >= self.threshold
+
+            with self._lock:
+                self.stats[model]['calls'] += 1
+                if accepted:
+                    self.stats[model]['accepted'] += 1
+
+            if accepted:
+                return response, model
+
+    def report(self) -> Dict[str, Dict]:
+        """Per-tier call counts and the share of requests each tier resolved."""
+        with self._lock:
+            requests = self.stats[self.models[0]]['calls']
+            return {
+                model: {
+                    'calls': counts['calls'],
+                    'accepted': counts['accepted'],
+                    'hit_rate': counts['accepted'] / requests if requests else 0.0,
+                }
+                for model, counts in self.stats.items()
+            }
+
+    def print_report(self) -> None:
+        for model, counts in self.report().items():
+            print(f"{model:20} calls: {counts['calls']:5}  accepted: {counts['accepted']:5}  "
+                  f"hit rate: {counts['hit_rate']:.1%}")
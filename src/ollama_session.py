@@ -0,0 +1,121 @@
+import threading
+from typing import Dict, List, Optional
+
+import ollama
+
+class OllamaSession:
+    def __init__(self, model_name: str, system_prompt: str, keep_alive: str = '30m',
+                 options: Optional[Dict] = None):
+        """Initialize a session that keeps the model loaded and reuses the prompt prefix.
+
+        Every request is sent as the same system message followed by a variable
+        user message, so the server can reuse the cached prefix instead of
+        re-evaluating the instructions on every page. Ollama reloads the model
+        when num_ctx changes, so the same options go with every call,
+        including the warm-up.
+
+        Args:
+            model_name (str): Default model for requests
+            system_prompt (str): Fixed instructions sent first on every request
+            keep_alive (str): How long Ollama keeps the model loaded between requests
+            options (Dict, optional): Ollama model options (e.g. num_ctx) sent with every call
+        """
+        self.model_name = model_name
+        self.system_prompt = system_prompt
+        self.keep_alive = keep_alive
+        self.options = options or {}
+        self.last_metrics: Optional[Dict] = None
+        self._totals = {label: {'calls': 0, 'load_duration': 0, 'prompt_eval_duration': 0,
+                                'prompt_eval_count': 0}
+                        for label in ('warm_up', 'first', 'later')}
+        self._lock = threading.Lock()
+
+    def _messages(self, content: str, images: Optional[List[str]] = None) -> List[Dict]:
+        user_message = {'role': 'user', 'content': content}
+        if images:
+            user_message['images'] = images
+        return [{'role': 'system', 'content': self.system_prompt}, user_message]
+
+    def _record(self, model_name: str, response, warm_up: bool = False) -> None:
+        metrics = {
+            'model': model_name,
+            'load_duration': response.get('load_duration', 0) or 0,
+            'prompt_eval_count': response.get('prompt_eval_count', 0) or 0,
+            'prompt_eval_duration': response.get('prompt_eval_duration', 0) or 0,
+            'eval_count': response.get('eval_count', 0) or 0,
+            'eval_duration': response.get('eval_duration', 0) or 0,
+            'total_duration': response.get('total_duration', 0) or 0,
+        }
+        with self._lock:
+            if warm_up:
+                label = 'warm_up'
+            else:
+                label = 'later' if self._totals['first']['calls'] else 'first'
+                self.last_metrics = metrics
+            totals = self._totals[label]
+            totals['calls'] += 1
+            for key in ('load_duration', 'prompt_eval_duration', 'prompt_eval_count'):
+                totals[key] += metrics[key]
+
+    def warm_up(self, model_name: str = None) -> None:
+        """Load the model and prefill the system prompt before real work arrives."""
+        model_name = model_name or self.model_name
+        try:
+            response = ollama.chat(
+                model=model_name,
+                messages=self._messages('Reply with OK.'),
+                keep_alive=self.keep_alive,
+                options={**self.options, 'num_predict': 1}
+            )
+            self._record(model_name, response, warm_up=True)
+        except Exception as e:
+            print(f'Error warming up {model_name}: {e}')
+
+    def chat(self, content: str, images: Optional[List[str]] = None, model_name: str = None,
+             options: Optional[Dict] = None) -> str:
+        """Send the variable part of a request after the fixed system prompt.
+
+        Args:
+            content (str): User message for this request
+            images (List[str], optional): Image paths attached to the user message
+            model_name (str, optional): Override the session's default model
+            options (Dict, optional): Ollama model options added to the session's options
+
+        Returns:
+            str: Response text
+        """
+        model_name = model_name or self.model_name
+        response = ollama.chat(
+            model=model_name,
+            messages=self._messages(content, images),
+            keep_alive=self.keep_alive,
+            options={**self.options, **(options or {})}
+        )
+        self._record(model_name, response)
+        return response['message']['content']
+
+    def report(self) -> Dict[str, Dict]:
+        """Average load and prompt evaluation times of the first call versus later calls."""
+        with self._lock:
+            totals = {label: dict(values) for label, values in self._totals.items()}
+
+        report = {}
+        for label, values in totals.items():
+            n = values['calls']
+            if not n:
+                report[label] = {'calls': 0}
+                continue
+            report[label] = {
+                'calls': n,
+                'load_ms': values['load_duration'] / n / 1e6,
+                'prompt_eval_ms': values['prompt_eval_duration'] / n / 1e6,
+                'prompt_tokens': values['prompt_eval_count'] / n,
+            }
+        return report
+
+    def print_report(self) -> None:
+        for label, stats in self.report().items():
+            if not stats['calls']:
+                continue
+            print(f"{label:8} calls: {stats['calls']:4}  load: {stats['load_ms']:8.1f} ms  "
+                  f"prompt eval: {stats['prompt_eval_ms']:8.1f} ms  prompt tokens: {stats['prompt_tokens']:6.0f}")
@@ -1,17 +1,64 @@
+import hashlib
 import os
 from pathlib import Path
-from typing import List
-import ollama
+from typing import Dict, List, Optional
 import fitz  # PyMuPDF
+from run_log import RunLog, default_run_log
+from model_cascade import ModelCascade, score_resume_xml
+from xml_validator import XMLValidator
+from llama_prompts import get_repair_prompt, get_compact_resume_prompt
+from compact_schema import CompactSchemaExpander
+from ollama_session import OllamaSession
 
 class PDFProcessor:
-    def __init__(self, model_name: str = 'llama3.2-vision'):
+    def __init__(self, model_name: str = 'llama3.2-vision', context_budget: int = 8192,
+                 max_pages_per_request: int = 2, image_tokens: int = 1601,
+                 output_tokens_per_page: int = 1500, run_log: Optional[RunLog] = None,
+                 cascade: Optional[ModelCascade] = None, validator: Optional[XMLValidator] = None,
+                 max_repairs: int = 1, schema_mode: str = 'full',
+                 session: Optional[OllamaSession] = None, keep_alive: str = '30m'):
         """Initialize PDF processor with Ollama model.
-        
+
         Args:
             model_name (str): Name of the LLaMA model to use
+            context_budget (int): Context window (num_ctx) sent with every request, so packed
+                and single-page requests never make Ollama reload the model
+            max_pages_per_request (int): Upper bound on pages stitched into one image
+            image_tokens (int): Estimated context cost of one image
+            output_tokens_per_page (int): Estimated XML tokens generated per page
+            run_log (RunLog, optional): Log receiving every model response, the shared default log otherwise
+            cascade (ModelCascade, optional): Try cheaper models first instead of model_name
+            validator (XMLValidator, optional): Run page-level checks on each page and re-prompt only failing ones
+            max_repairs (int): Repair attempts for a page that fails validation
+            schema_mode (str): 'full' for the structured schema, 'compact' for the terse
+                schema that is expanded back to the full tree after generation
+            session (OllamaSession, optional): Shared session; one is created from the system prompt otherwise
+            keep_alive (str): How long Ollama keeps the model loaded between requests
         """
+        if schema_mode not in ('full', 'compact'):
+            raise ValueError(f'Unknown schema mode: {schema_mode}')
+
         self.model_name = model_name
+        self.context_budget = context_budget
+        self.max_pages_per_request = max_pages_per_request
+        self.image_tokens = image_tokens
+        self.output_tokens_per_page = output_tokens_per_page
+        self._run_log = run_log
+        self.cascade = cascade
+        self.validator = validator
+        self.max_repairs = max_repairs
+        self.validation_stats = {'pages': 0, 'valid': 0, 'repaired': 0, 'failed': 0}
+        self.schema_mode = schema_mode
+        self.expander = CompactSchemaExpander()
+        self.session = session or OllamaSession(model_name, self.get_system_prompt(), keep_alive,
+                                                 {'num_ctx': context_budget})
+
+    @property
+    def run_log(self) -> RunLog:
+        """Run log for model calls, resolved on first use so unused processors stay cheap."""
+        if self._run_log is None:
+            self._run_log = default_run_log()
+        return self._run_log
 
     def get_structured_prompt(self) -> str:
         """Generate a detailed prompt for LLaMA to extract structured XML."""
@@ -110,12 +157,109 @@ class PDFProcessor:
         7. Maintain strict XML structure
         """
 
-    def pdf_to_images(self, pdf_path: str, output_dir: str = None) -> List[str]:
+    def get_system_prompt(self) -> str:
+        """Fixed instructions sent first on every request, so the server can reuse the prefix."""
+        if self.schema_mode == 'compact':
+            return get_compact_resume_prompt()
+        return self.get_structured_prompt()
+
+    def get_page_instruction(self, page_count: int) -> str:
+        """Variable part of a request, describing the attached image.
+
+        Args:
+            page_count (int): Number of resume pages stitched into the image
+
+        Returns:
+            str: User message for the request
+        """
+        if page_count <= 1:
+            return 'Extract the resume page in this image using the structure above.'
+
+        return f"""
+        This image contains {page_count} consecutive pages of the same resume, stacked top to bottom.
+        Treat them as one document: produce exactly one resume element covering every page, and
+        continue any position, list or section that runs across a page boundary instead of repeating it.
+        """
+
+    def get_packed_prompt(self, page_count: int) -> str:
+        """Generate the full prompt (system and user parts) for an image of one or more pages.
+
+        Args:
+            page_count (int): Number of resume pages stitched into the image
+
+        Returns:
+            str: Prompt text as seen by the model, used for logging and cache keys
+        """
+        return self.get_system_prompt() + '\n' + self.get_page_instruction(page_count)
+
+    def extraction_version(self) -> str:
+        """Describe everything that changes the model output for the same page image.
+
+        Returns:
+            str: Model (or cascade), schema mode and prompt hash, for cache and reuse checks
+        """
+        models = '>'.join(self.cascade.models) if self.cascade else self.model_name
+        prompt_sha = hashlib.sha256(self.get_packed_prompt(1).encode('utf-8')).hexdigest()
+        return f'model={models};schema={self.schema_mode};prompt={prompt_sha}'
+
+    def expand_response(self, content: str) -> str:
+        """Expand a compact-schema response to the full tree; other responses pass through.
+
+        Args:
+            content (str): Raw LLaMA response
+
+        Returns:
+            str: Response in the full structured schema when it could be expanded
+        """
+        if self.schema_mode != 'compact' or '<resume' in content:
+            return content
+        return self.expander.expand(content) or content
+
+    def estimate_request_tokens(self, page_count: int) -> int:
+        """Roughly estimate the context needed to process pages in one request.
+
+        Args:
+            page_count (int): Number of pages packed into the request
+
+        Returns:
+            int: Estimated prompt, image and output tokens
+        """
+        prompt_tokens = len(self.get_packed_prompt(page_count)) // 4
+        return prompt_tokens + self.image_tokens + page_count * self.output_tokens_per_page
+
+    def plan_page_groups(self, page_count: int) -> List[List[int]]:
+        """Split page indices into groups that fit the context budget.
+
+        Groups of a single page mean the pages are processed one call at a time.
+
+        Args:
+            page_count (int): Number of pages in the document
+
+        Returns:
+            List[List[int]]: Zero-based page indices for each request
+        """
+        group_size = 1
+        for size in range(min(self.max_pages_per_request, page_count), 1, -1):
+            if self.estimate_request_tokens(size) <= self.context_budget:
+                group_size = size
+                break
+
+        return [list(range(start, min(start + group_size, page_count)))
+                for start in range(0, page_count, group_size)]
+
+    def warm_up(self) -> None:
+        """Load the first model to be used and prefill the system prompt."""
+        self.session.warm_up(self.cascade.models[0] if self.cascade else self.model_name)
+
+    def pdf_to_images(self, pdf_path: str, output_dir: str = None,
+                      pages: Optional[List[int]] = None, dpi: int = 300) -> List[str]:
         """Convert PDF pages to images for LLaMA vision processing.
         
         Args:
             pdf_path (str): Path to PDF file
             output_dir (str, optional): Directory to save images
+            pages (List[int], optional): Zero-based pages to render, all pages by default
+            dpi (int): Render resolution
             
         Returns:
             List[str]: Paths to generated images
@@ -127,7 +271,9 @@ class PDFProcessor:
         try:
             doc = fitz.open(pdf_path)
             for page_num, page in enumerate(doc):
-                pix = page.get_pixmap(matrix=fitz.Matrix(300/72, 300/72))
+                if pages is not None and page_num not in pages:
+                    continue
+                pix = page.get_pixmap(matrix=fitz.Matrix(dpi/72, dpi/72))
                 img_path = os.path.join(output_dir if output_dir else os.path.dirname(pdf_path),
                                        f'page_{page_num + 1}.png')
                 pix.save(img_path)
@@ -139,58 +285,159 @@ class PDFProcessor:
             print(f'Error converting PDF to images: {e}')
             raise
 
-    def process_image(self, image_path: str) -> str:
-        """Process a single image through LLaMA vision.
+    def pdf_to_packed_images(self, pdf_path: str, page_groups: List[List[int]],
+                             output_dir: str = None) -> List[str]:
+        """Stitch groups of PDF pages vertically into one image per group.
+
+        The vision encoder resizes every image to a fixed input size, so a
+        stitched image of n pages gives each page roughly 1/n of the
+        resolution a single-page request would. Keep max_pages_per_request
+        low for dense or small-print resumes.
+
+        Args:
+            pdf_path (str): Path to PDF file
+            page_groups (List[List[int]]): Zero-based page indices for each image
+            output_dir (str, optional): Directory to save images
+
+        Returns:
+            List[str]: Paths to generated images, one per group
+        """
+        if output_dir:
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+        image_paths = []
+        try:
+            doc = fitz.open(pdf_path)
+            for pages in page_groups:
+                width = max(doc[p].rect.width for p in pages)
+                height = sum(doc[p].rect.height for p in pages)
+
+                stitched = fitz.open()
+                canvas = stitched.new_page(width=width, height=height)
+                top = 0
+                for p in pages:
+                    rect = doc[p].rect
+                    canvas.show_pdf_page(fitz.Rect(0, top, rect.width, top + rect.height), doc, p)
+                    top += rect.height
+
+                pix = canvas.get_pixmap(matrix=fitz.Matrix(300/72, 300/72))
+                img_path = os.path.join(output_dir if output_dir else os.path.dirname(pdf_path),
+                                       f'pages_{pages[0] + 1}-{pages[-1] + 1}.png')
+                pix.save(img_path)
+                image_paths.append(img_path)
+                stitched.close()
+
+            return image_paths
+
+        except Exception as e:
+            print(f'Error converting PDF to packed images: {e}')
+            raise
+
+    def process_image(self, image_path: str, page_count: int = 1, document: str = None,
+                      pages: List[int] = None, **metadata) -> str:
+        """Process a single image through LLaMA vision and log the response.
         
         Args:
             image_path (str): Path to image file
+            page_count (int): Number of resume pages stitched into the image
+            document (str, optional): Source document recorded in the run log
+            pages (List[int], optional): One-based pages recorded in the run log
+            **metadata: Extra fields stored with the run log record
             
         Returns:
             str: XML-structured text from LLaMA
         """
         try:
-            prompt = self.get_structured_prompt()
-            response = ollama.chat(
-                model=self.model_name,
-                messages=[{
-                    'role': 'user',
-                    'content': prompt,
-                    'images': [image_path]
-                }]
-            )
-            
-            return response['message']['content']
+            instruction = self.get_page_instruction(page_count)
+
+            # The run log keeps the model's own output so the expander can be replayed
+            raw_responses: Dict[str, str] = {}
+
+            def chat(model_name: str, content: str = instruction) -> str:
+                response = self.session.chat(content, images=[image_path], model_name=model_name)
+                expanded = self.expand_response(response)
+                raw_responses[expanded] = response
+                return expanded
+
+            if self.cascade:
+                result, model_name = self.cascade.run(chat, score_resume_xml)
+            else:
+                result = chat(self.model_name)
+                model_name = self.model_name
+
+            errors = self.validator.errors(result, page=True) if self.validator is not None else []
+            record_id = self.run_log.log('vision_extraction', self.get_packed_prompt(page_count),
+                                         raw_responses.get(result, result), model=model_name,
+                                         document=document, pages=pages, schema_mode=self.schema_mode,
+                                         validation_errors=[issue['code'] for issue in errors], **metadata)
+
+            # Only pages that fail local validation get a targeted repair prompt
+            if self.validator is not None:
+                self.validation_stats['pages'] += 1
+                if not errors:
+                    self.validation_stats['valid'] += 1
+                else:
+                    for _ in range(self.max_repairs):
+                        repair_prompt = get_repair_prompt(result, errors)
+                        repaired = chat(model_name, repair_prompt)
+                        repaired_errors = self.validator.errors(repaired, page=True)
+                        accepted = len(repaired_errors) < len(errors)
+                        # The repair prompt embeds the page XML, so only the
+                        # system prompt is stored by hash
+                        self.run_log.log('vision_repair', self.get_system_prompt(),
+                                         raw_responses.get(repaired, repaired), model=model_name,
+                                         document=document, pages=pages, schema_mode=self.schema_mode,
+                                         repair_of=record_id, payload=repair_prompt, accepted=accepted,
+                                         validation_errors=[issue['code'] for issue in repaired_errors])
+                        if accepted:
+                            result, errors = repaired, repaired_errors
+                        if not errors:
+                            break
+                    self.validation_stats['repaired' if not errors else 'failed'] += 1
+
+            return result
             
         except Exception as e:
             print(f'Error processing image through LLaMA: {e}')
             raise
 
-    def process_pdf(self, pdf_path: str, save_images: bool = False) -> List[str]:
+    def process_pdf(self, pdf_path: str, save_images: bool = False,
+                    pack_pages: bool = False, document: str = None) -> List[str]:
         """Process entire PDF through the pipeline.
         
         Args:
             pdf_path (str): Path to PDF file
             save_images (bool): Whether to save intermediate images
+            pack_pages (bool): Send several pages per request when they fit the
+                context budget, falling back to one call per page otherwise
+            document (str, optional): Name recorded in the run log, defaults to the file name
             
         Returns:
-            List[str]: Generated XML for each page
+            List[str]: Generated XML for each request (one per page unless packed)
         """
         try:
             output_dir = None
             if save_images:
                 output_dir = os.path.join(os.path.dirname(pdf_path), 'processed_images')
 
-            images = self.pdf_to_images(pdf_path, output_dir)
-            results = [self.process_image(img_path) for img_path in images]
+            page_groups = None
+            if pack_pages:
+                with fitz.open(pdf_path) as doc:
+                    page_count = len(doc)
+                page_groups = self.plan_page_groups(page_count)
+                if all(len(pages) == 1 for pages in page_groups):
+                    page_groups = None
 
-            # Save LLaMA outputs
-            output_dir = os.path.join(os.path.dirname(pdf_path), 'llama_outputs')
-            Path(output_dir).mkdir(parents=True, exist_ok=True)
-            
-            for i, content in enumerate(results):
-                output_path = os.path.join(output_dir, f'output_page_{i+1}.xml')
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+            if page_groups:
+                images = self.pdf_to_packed_images(pdf_path, page_groups, output_dir)
+            else:
+                images = self.pdf_to_images(pdf_path, output_dir)
+                page_groups = [[i] for i in range(len(images))]
+
+            document = document or os.path.basename(pdf_path)
+            results = []
+            for img_path, pages in zip(images, page_groups):
+                results.append(self.process_image(img_path, len(pages), document, [p + 1 for p in pages]))
 
             return results
 
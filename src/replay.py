@@ -0,0 +1,208 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+# Parsing stages are imported inside the workers so the command starts
+# without loading ollama or fitz.
+_stages: Dict = {}
+
+def load_saved_outputs(paths: List[str]) -> Iterator[Dict]:
+    """Stream saved model responses from run logs and legacy output files.
+
+    Args:
+        paths (List[str]): Run log directories, legacy output directories or files
+
+    Yields:
+        Dict: Items with id, kind, document, pages and response
+    """
+    for path in paths:
+        if os.path.isdir(path) and os.path.exists(os.path.join(path, 'index.jsonl')):
+            from run_log import RunLogReader
+            for record in RunLogReader(path).read_records():
+                yield {
+                    'id': record['id'],
+                    'kind': record['kind'],
+                    'document': record['document'],
+                    'pages': record['pages'],
+                    'response': record['response'],
+                    'schema_mode': record['metadata'].get('schema_mode', 'full'),
+                }
+            continue
+
+        files = [path]
+        if os.path.isdir(path):
+            files = sorted(glob.glob(os.path.join(path, 'llama_output_*.txt')) +
+                           glob.glob(os.path.join(path, 'output_page*.xml')))
+
+        for file_path in files:
+            item = _load_legacy_file(file_path)
+            if item:
+                yield item
+
+def _load_legacy_file(file_path: str) -> Optional[Dict]:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    name = os.path.basename(file_path)
+    if name.startswith('llama_output_'):
+        # Files written by the old KnowledgeGraphParser.save_llama_output
+        marker = '=== Response ==='
+        start = content.find(marker)
+        if start == -1:
+            return None
+        return {
+            'id': file_path,
+            'kind': 'graph_analysis',
+            'document': None,
+            'pages': [],
+            'response': content[start + len(marker):].strip(),
+        }
+
+    # Files written by the old PDFProcessor.process_pdf
+    page = re.search(r'output_page_(\d+)', name)
+    return {
+        'id': file_path,
+        'kind': 'vision_extraction',
+        'document': None,
+        'pages': [int(page.group(1))] if page else [],
+        'response': content,
+    }
+
+def replay_item(item: Dict) -> Dict:
+    """Run one saved response through the current parsing stages.
+
+    Args:
+        item (Dict): Saved response from load_saved_outputs
+
+    Returns:
+        Dict: Item identity, a digest of the parsed output and a short summary
+    """
+    if item['kind'] == 'graph_analysis':
+        if 'graph' not in _stages:
+            from knowledge_graph_parser import KnowledgeGraphParser
+            _stages['graph'] = KnowledgeGraphParser()
+        entities, relations = _stages['graph'].extract_entities_and_relations(item['response'])
+        output = {'entities': entities, 'relations': relations}
+        summary = {'entities': len(entities), 'relations': len(relations)}
+    else:
+        if 'xml' not in _stages:
+            from xml_processor import XMLProcessor
+            from xml_extractor import XMLExtractor
+            _stages['xml'] = (XMLProcessor(), XMLExtractor())
+        processor, extractor = _stages['xml']
+        response = item['response']
+        # Compact responses are logged as generated, so expander changes are replayed too
+        if item.get('schema_mode') == 'compact' and '<resume' not in response:
+            if 'expander' not in _stages:
+                from compact_schema import CompactSchemaExpander
+                _stages['expander'] = CompactSchemaExpander()
+            response = _stages['expander'].expand(response) or response
+        xml_content = processor.extract_xml_from_text(response)
+        tags = processor.extract_tags(xml_content) if xml_content else []
+        extracted = extractor.extract_all_tags(xml_content) if xml_content else []
+        output = {'xml': xml_content, 'tags': tags, 'extracted': extracted}
+        summary = {'xml_found': xml_content is not None, 'tags': len(tags)}
+
+    digest = hashlib.sha256(json.dumps(output, sort_keys=True).encode('utf-8')).hexdigest()
+    return {
+        'id': item['id'],
+        'kind': item['kind'],
+        'document': item['document'],
+        'pages': item['pages'],
+        'digest': digest,
+        'summary': summary,
+    }
+
+def _batches(items: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def load_results(path: str) -> Dict[str, Dict]:
+    """Load a previous replay results file keyed by item id."""
+    results = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                result = json.loads(line)
+                results[result['id']] = result
+    return results
+
+def replay(paths: List[str], output_path: str, baseline_path: str = None, workers: int = None) -> Dict:
+    """Replay saved outputs in parallel and compare against a previous run.
+
+    Args:
+        paths (List[str]): Sources passed to load_saved_outputs
+        output_path (str): JSON-lines file receiving the new results
+        baseline_path (str, optional): Results file from a previous replay
+        workers (int, optional): Worker processes, defaults to the CPU count
+
+    Returns:
+        Dict: Throughput and difference counts
+    """
+    baseline = load_results(baseline_path) if baseline_path else {}
+    workers = workers or os.cpu_count() or 1
+    seen = set()
+    changed = []
+    added = 0
+    count = 0
+    response_bytes = 0
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            open(output_path, 'w', encoding='utf-8') as out:
+        for batch in _batches(load_saved_outputs(paths), workers * 64):
+            response_bytes += sum(len(item['response']) for item in batch)
+            for result in executor.map(replay_item, batch, chunksize=16):
+                out.write(json.dumps(result) + '\n')
+                count += 1
+                seen.add(result['id'])
+
+                previous = baseline.get(result['id'])
+                if previous is None:
+                    added += 1
+                elif previous['digest'] != result['digest']:
+                    changed.append((previous, result))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'items': count,
+        'seconds': elapsed,
+        'items_per_second': count / elapsed if elapsed else 0.0,
+        'mb_per_second': response_bytes / 1e6 / elapsed if elapsed else 0.0,
+        'changed': changed,
+        'added': added if baseline else 0,
+        'missing': len(set(baseline) - seen),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-parse saved model outputs without inference')
+    parser.add_argument('paths', nargs='+', help='Run log directories, llama_outputs directories or files')
+    parser.add_argument('--output', default='replay_results.jsonl', help='Where to write the new results')
+    parser.add_argument('--baseline', help='Results file from a previous replay to compare against')
+    parser.add_argument('--workers', type=int, help='Number of worker processes')
+    args = parser.parse_args()
+
+    report = replay(args.paths, args.output, args.baseline, args.workers)
+
+    print(f"Replayed {report['items']} outputs in {report['seconds']:.2f}s "
+          f"({report['items_per_second']:.1f} outputs/s, {report['mb_per_second']:.2f} MB/s)")
+    if args.baseline:
+        print(f"Changed: {len(report['changed'])}, new: {report['added']}, missing: {report['missing']}")
+        for previous, result in report['changed']:
+            print(f"  {result['kind']} {result['document'] or ''} {result['id']}: "
+                  f"{previous['summary']} -> {result['summary']}")
+
+if __name__ == '__main__':
+    main()
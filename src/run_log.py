@@ -0,0 +1,320 @@
+import atexit
+import gzip
+import hashlib
+import io
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+# Records buffered before the writer appends a frame even if more are queued
+FLUSH_RECORDS = 100
+
+# Raised when the last frame of a segment is incomplete
+TRUNCATED_ERRORS = (EOFError, gzip.BadGzipFile) + ((zstandard.ZstdError,) if zstandard else ())
+
+class RunLogReader:
+    def __init__(self, log_dir: str = None):
+        """Initialize read-only access to a run log without creating files or threads.
+
+        Args:
+            log_dir (str, optional): Directory for segments, prompts and index
+        """
+        self.log_dir = log_dir or os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                               'llama_outputs', 'run_log')
+        self.segment_dir = os.path.join(self.log_dir, 'segments')
+        self.prompt_dir = os.path.join(self.log_dir, 'prompts')
+        self.index_path = os.path.join(self.log_dir, 'index.jsonl')
+
+    def _open_read(self, path: str):
+        if path.endswith('.zst'):
+            if zstandard is None:
+                raise RuntimeError(f'zstandard is required to read {path}')
+            reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True,
+                                                                 closefd=True)
+            return io.TextIOWrapper(reader, encoding='utf-8')
+        return gzip.open(path, 'rt', encoding='utf-8')
+
+    def read_index(self) -> List[Dict]:
+        """Read all index entries.
+
+        Returns:
+            List[Dict]: Index entries in write order
+        """
+        if not os.path.exists(self.index_path):
+            return []
+
+        entries = []
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+        return entries
+
+    def read_records(self, document: str = None, page: int = None) -> Iterator[Dict]:
+        """Stream records, optionally filtered by document and page.
+
+        Args:
+            document (str, optional): Only records for this document
+            page (int, optional): Only records covering this page
+
+        Yields:
+            Dict: Logged records
+        """
+        entries = self.read_index()
+        if document is not None:
+            entries = [e for e in entries if e['document'] == document]
+        if page is not None:
+            entries = [e for e in entries if page in e['pages']]
+
+        wanted = {}
+        for entry in entries:
+            wanted.setdefault(entry['segment'], set()).add(entry['id'])
+
+        for segment in sorted(wanted):
+            path = os.path.join(self.segment_dir, segment)
+            if not os.path.exists(path):
+                continue
+            try:
+                with self._open_read(path) as f:
+                    for line in f:
+                        # A frame cut short by a crash or an in-progress write ends the segment
+                        if not line.endswith('\n'):
+                            break
+                        if not line.strip():
+                            continue
+                        record = json.loads(line)
+                        if record['id'] in wanted[segment]:
+                            yield record
+            except TRUNCATED_ERRORS:
+                continue
+
+    def read_prompt(self, prompt_sha: str) -> Optional[str]:
+        """Load a stored prompt by its hash.
+
+        Args:
+            prompt_sha (str): SHA-256 of the prompt
+
+        Returns:
+            Optional[str]: Prompt text or None if it was pruned
+        """
+        for extension in ('.zst', '.gz'):
+            path = os.path.join(self.prompt_dir, f'{prompt_sha}.txt{extension}')
+            if os.path.exists(path):
+                with self._open_read(path) as f:
+                    return f.read()
+        return None
+
+class RunLog(RunLogReader):
+    def __init__(self, log_dir: str = None, retention_days: Optional[int] = 30,
+                 max_records_per_segment: int = 10000):
+        """Initialize an append-only, compressed log of model calls.
+
+        Records are JSON lines written by a background thread into compressed
+        segments. Prompts are stored once per content hash and referenced by
+        records; a plain-text index maps each record to its document and pages.
+
+        Args:
+            log_dir (str, optional): Directory for segments, prompts and index
+            retention_days (Optional[int]): Delete segments older than this, None keeps all
+            max_records_per_segment (int): Records written before starting a new segment
+        """
+        super().__init__(log_dir)
+        os.makedirs(self.segment_dir, exist_ok=True)
+        os.makedirs(self.prompt_dir, exist_ok=True)
+
+        self.extension = '.zst' if zstandard else '.gz'
+        self.retention_days = retention_days
+        self.max_records_per_segment = max_records_per_segment
+
+        self._queue: queue.Queue = queue.Queue()
+        self._segment = None
+        self._segment_records = 0
+        self._pending: List[str] = []
+        self._pending_index: List[Dict] = []
+        self._known_prompts = set()
+        self._closed = False
+
+        self.prune()
+
+        self._writer = threading.Thread(target=self._write_loop, name='run-log-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def log(self, kind: str, prompt: str, response: str, model: str = None,
+            document: str = None, pages: List[int] = None, **metadata) -> str:
+        """Queue a model call for writing.
+
+        Args:
+            kind (str): Pipeline stage that made the call, e.g. 'vision_extraction'
+            prompt (str): Prompt sent to the model
+            response (str): Model response text
+            model (str, optional): Model name
+            document (str, optional): Source document identifier
+            pages (List[int], optional): One-based page numbers covered by the call
+            **metadata: Extra JSON-serializable fields stored with the record
+
+        Returns:
+            str: Record id
+        """
+        if self._closed:
+            raise RuntimeError('Run log is closed')
+
+        record = {
+            'id': uuid.uuid4().hex,
+            'timestamp': datetime.now().isoformat(),
+            'kind': kind,
+            'model': model,
+            'document': document,
+            'pages': pages or [],
+            'prompt_sha': hashlib.sha256(prompt.encode('utf-8')).hexdigest(),
+            'response': response,
+            'metadata': metadata,
+        }
+        self._queue.put((record, prompt))
+        return record['id']
+
+    def flush(self) -> None:
+        """Block until every queued record is readable from the segments."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Flush pending records and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._flush()
+                self._queue.task_done()
+                break
+
+            try:
+                self._write(*item)
+            except Exception as e:
+                print(f'Error writing run log record: {e}')
+
+            if self._queue.empty() or len(self._pending) >= FLUSH_RECORDS:
+                self._flush()
+            self._queue.task_done()
+
+    def _write(self, record: Dict, prompt: str) -> None:
+        self._store_prompt(record['prompt_sha'], prompt)
+
+        if self._segment is None or self._segment_records >= self.max_records_per_segment:
+            self._flush()
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            self._segment = f'run_{timestamp}_{uuid.uuid4().hex[:8]}.jsonl{self.extension}'
+            self._segment_records = 0
+
+        self._pending.append(json.dumps(record, ensure_ascii=False) + '\n')
+        self._segment_records += 1
+        self._pending_index.append({
+            'id': record['id'],
+            'document': record['document'],
+            'pages': record['pages'],
+            'kind': record['kind'],
+            'prompt_sha': record['prompt_sha'],
+            'segment': self._segment,
+        })
+
+    def _flush(self) -> None:
+        """Append pending records to the segment as one complete frame, then index them.
+
+        Each flush is a self-contained gzip member or zstd frame, so everything
+        flushed so far can be read while the segment is still being written.
+        """
+        if not self._pending:
+            return
+
+        try:
+            data = self._compress(''.join(self._pending).encode('utf-8'))
+            with open(os.path.join(self.segment_dir, self._segment), 'ab') as f:
+                f.write(data)
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                for entry in self._pending_index:
+                    f.write(json.dumps(entry) + '\n')
+        except Exception as e:
+            print(f'Error flushing run log: {e}')
+        finally:
+            self._pending = []
+            self._pending_index = []
+
+    def _store_prompt(self, prompt_sha: str, prompt: str) -> None:
+        if prompt_sha in self._known_prompts:
+            return
+
+        path = os.path.join(self.prompt_dir, f'{prompt_sha}.txt{self.extension}')
+        if not os.path.exists(path):
+            tmp_path = os.path.join(self.prompt_dir, f'{prompt_sha}.{uuid.uuid4().hex[:8]}.tmp{self.extension}')
+            with open(tmp_path, 'wb') as f:
+                f.write(self._compress(prompt.encode('utf-8')))
+            os.replace(tmp_path, path)
+        self._known_prompts.add(prompt_sha)
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.extension == '.zst':
+            return zstandard.ZstdCompressor().compress(data)
+        return gzip.compress(data)
+
+    def prune(self) -> None:
+        """Apply the retention policy to segments, index entries and prompts."""
+        if self.retention_days is None:
+            return
+
+        cutoff = time.time() - self.retention_days * 86400
+        removed = set()
+        for name in os.listdir(self.segment_dir):
+            path = os.path.join(self.segment_dir, name)
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed.add(name)
+
+        if not removed:
+            return
+
+        entries = [e for e in self.read_index() if e['segment'] not in removed]
+        tmp_path = f'{self.index_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+        os.replace(tmp_path, self.index_path)
+
+        referenced = {e['prompt_sha'] for e in entries}
+        for name in os.listdir(self.prompt_dir):
+            if name.split('.')[0] not in referenced:
+                os.remove(os.path.join(self.prompt_dir, name))
+
+_default_run_log: Optional[RunLog] = None
+_default_lock = threading.Lock()
+
+def default_run_log() -> RunLog:
+    """Run log in the default directory, shared by every stage in the process."""
+    global _default_run_log
+    with _default_lock:
+        if _default_run_log is None or _default_run_log._closed:
+            _default_run_log = RunLog()
+        return _default_run_log
+
+def main():
+    # Example usage: print the latest records for each document
+    for record in RunLogReader().read_records():
+        pages = ', '.join(str(p) for p in record['pages'])
+        print(f"{record['timestamp']} {record['kind']} {record['document']} pages [{pages}]")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import fitz  # PyMuPDF
+import artifact_pipeline
+from artifact_pipeline import ArtifactPipeline, ArtifactStore
+from run_log import RunLog
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def chat(self, content, images=None, model_name=None, options=None):
+        self.calls += 1
+        return self.response
+
+def make_pipeline(store_dir, run_log, dpi=50):
+    pipeline = ArtifactPipeline(ArtifactStore(store_dir), dpi=dpi)
+    pipeline.pdf_processor._run_log = run_log
+    pipeline.pdf_processor.session = FakeSession('<resume><header><name>Kirk F Truax</name></header></resume>')
+    pipeline.graph_parser._run_log = run_log
+    pipeline.graph_parser._session = FakeSession('**Entities and Properties:**\n')
+    return pipeline
+
+def computed(pipeline):
+    return sorted(stage for stage, counts in pipeline.stats.items() if counts['computed'])
+
+def test_only_affected_stages_recompute():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, 'resume.pdf')
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), 'Kirk F Truax')
+        doc.save(pdf_path)
+        doc.close()
+
+        store_dir = os.path.join(tmp_dir, 'store')
+        run_log = RunLog(os.path.join(tmp_dir, 'run_log'))
+
+        pipeline = make_pipeline(store_dir, run_log)
+        pipeline.build(pdf_path)
+        assert computed(pipeline) == ['analyze', 'extract', 'graph', 'parse', 'render']
+
+        pipeline = make_pipeline(store_dir, run_log)
+        pipeline.build(pdf_path)
+        assert computed(pipeline) == []
+        assert pipeline.pdf_processor.session.calls == 0
+
+        # New render settings change the images, but identical extractions stop the cascade there
+        pipeline = make_pipeline(store_dir, run_log, dpi=60)
+        pipeline.build(pdf_path)
+        assert computed(pipeline) == ['extract', 'render']
+
+        # A parser change only reparses; its output is unchanged here, so analysis is reused
+        original = artifact_pipeline.PARSER_VERSION
+        artifact_pipeline.PARSER_VERSION = original + '-test'
+        try:
+            pipeline = make_pipeline(store_dir, run_log)
+            pipeline.build(pdf_path)
+            assert computed(pipeline) == ['parse']
+        finally:
+            artifact_pipeline.PARSER_VERSION = original
+
+        run_log.close()
+
+if __name__ == '__main__':
+    print("Starting artifact pipeline test...")
+    test_only_affected_stages_recompute()
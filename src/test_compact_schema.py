@@ -0,0 +1,70 @@
+import tempfile
+import xml.etree.ElementTree as ET
+from compact_schema import CompactSchemaExpander
+from pdf_processor import PDFProcessor
+from replay import load_saved_outputs, replay_item
+from run_log import RunLog
+from xml_validator import XMLValidator, STRUCTURED_XML_SPEC
+
+def test_expand_compact_response():
+    content = """Here is the compact XML:
+<r>
+<h n="Kirk F Truax" t="Software Development Apprentice">Engineer & former naval officer</h>
+<ts><s n="Python" p="a" c="Flask services"/><s n="Docker" p="intermediate"/></ts>
+<ss><s n="Leadership" d="Navy Medicine"/></ss>
+<x>
+<p c="Creating Coding Careers" t="Software Development Apprentice" s="2024-02" e="2024-08">
+<i>Built REST APIs</i>
+<a m="Cut build time 40%" k="Docker; Python">Automated CI pipeline</a>
+</p>
+</x>
+<ed><d l="Bachelor" f="Nuclear Engineering" u="Oregon State University" st="completed" dt="2018-06" k="Radiation Detection"/></ed>
+<pj><j n="Job Tracker" k="Python" o="Used daily">Resume knowledge graph</j></pj>
+</r>"""
+
+    expanded = CompactSchemaExpander().expand(content)
+    print("\nExpanded XML:")
+    print(expanded)
+
+    resume = ET.fromstring(expanded)
+    assert resume.findtext('header/summary') == 'Engineer & former naval officer'
+    assert [s.findtext('proficiency') for s in resume.findall('skills/technical/skill')] == ['advanced', 'intermediate']
+    assert resume.findtext('skills/soft/skill/demonstration') == 'Navy Medicine'
+    assert resume.findtext('experience/position/duration/start') == '2024-02'
+    assert resume.findtext('experience/position/responsibilities/item') == 'Built REST APIs'
+    techs = [t.text for t in resume.findall('experience/position/achievements/achievement/technologies_used/tech')]
+    assert techs == ['Docker', 'Python']
+    assert resume.findtext('education/degree/graduation/date') == '2018-06'
+    assert resume.findtext('education/degree/relevantCourses/course') == 'Radiation Detection'
+    assert resume.findtext('projects/project/outcome') == 'Used daily'
+
+    # The expanded tree is the canonical schema the rest of the pipeline expects
+    assert XMLValidator(STRUCTURED_XML_SPEC).errors(expanded) == []
+
+def test_expand_without_compact_xml():
+    assert CompactSchemaExpander().expand("<resume></resume>") is None
+
+def test_raw_compact_response_is_logged():
+    compact = '<r><h n="Kirk F Truax" t="Apprentice">Engineer</h></r>'
+    with tempfile.TemporaryDirectory() as log_dir:
+        run_log = RunLog(log_dir)
+        processor = PDFProcessor(schema_mode='compact', run_log=run_log)
+        processor.session.chat = lambda content, images=None, model_name=None, options=None: compact
+
+        expanded = processor.process_image('page_1.png', document='a.pdf', pages=[1])
+        assert ET.fromstring(expanded).findtext('header/name') == 'Kirk F Truax'
+        run_log.close()
+
+        # The log keeps what the model generated; replay expands it with the current expander
+        record = next(run_log.read_records())
+        assert record['response'] == compact
+        assert record['metadata']['schema_mode'] == 'compact'
+
+        item = next(load_saved_outputs([log_dir]))
+        assert replay_item(item)['summary']['xml_found']
+
+if __name__ == '__main__':
+    print("Starting compact schema test...")
+    test_expand_compact_response()
+    test_expand_without_compact_xml()
+    test_raw_compact_response_is_logged()
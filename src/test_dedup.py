@@ -0,0 +1,118 @@
+import os
+import tempfile
+import fitz  # PyMuPDF
+from dedup import DeduplicatingProcessor, DuplicateIndex, ResumeFingerprinter
+
+class FakeProcessor:
+    """Stands in for PDFProcessor and records which pages reach the model."""
+    def __init__(self, version='model=fake;schema=full;prompt=0'):
+        self.processed = []
+        self.documents = []
+        self.version = version
+
+    def extraction_version(self):
+        return self.version
+
+    def pdf_to_images(self, pdf_path, output_dir=None, pages=None):
+        return [f'{pdf_path}#{page}' for page in pages]
+
+    def process_image(self, image_path, **log_fields):
+        self.processed.append(image_path)
+        self.documents.append(log_fields['document'])
+        return f'<resume><header><name>{image_path}</name></header></resume>'
+
+def make_scanned_pdf(path, name_width):
+    """A text-less page: the shared template plus a block standing in for the name."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.draw_rect(fitz.Rect(50, 50, 550, 120), color=(0, 0, 0), fill=(0.2, 0.2, 0.2))
+    page.draw_rect(fitz.Rect(50, 150, 550, 700), color=(0, 0, 0))
+    page.draw_rect(fitz.Rect(60, 160, 60 + name_width, 175), fill=(0, 0, 0))
+    doc.save(path)
+    doc.close()
+
+def make_text_pdf(path, lines):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), '\n'.join(lines))
+    doc.save(path)
+    doc.close()
+
+def test_textless_pdfs_are_not_merged():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        first, second = os.path.join(tmp_dir, 'first.pdf'), os.path.join(tmp_dir, 'second.pdf')
+        make_scanned_pdf(first, 120)
+        make_scanned_pdf(second, 140)
+
+        fingerprinter = ResumeFingerprinter()
+        assert not fingerprinter.fingerprint(first)['has_text']
+
+        processor = FakeProcessor()
+        deduplicator = DeduplicatingProcessor(processor, DuplicateIndex(os.path.join(tmp_dir, 'index')))
+        first_results = deduplicator.process_pdf(first)
+        second_results = deduplicator.process_pdf(second)
+
+        # Each candidate gets its own extraction
+        assert first_results != second_results
+        assert deduplicator.stats['near_duplicates'] == 0
+        assert len(processor.processed) == 2
+
+        # Re-uploading the exact same file is still reused
+        assert deduplicator.process_pdf(first) == first_results
+        assert len(processor.processed) == 2
+
+def test_near_duplicate_text_pdf_reuses_pages():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        lines = [f'Line {i} of a long resume about Python services and data pipelines' for i in range(30)]
+        first, second = os.path.join(tmp_dir, 'first.pdf'), os.path.join(tmp_dir, 'second.pdf')
+        make_text_pdf(first, lines)
+        make_text_pdf(second, lines)
+
+        processor = FakeProcessor()
+        deduplicator = DeduplicatingProcessor(processor, DuplicateIndex(os.path.join(tmp_dir, 'index')))
+        first_results = deduplicator.process_pdf(first)
+        assert deduplicator.process_pdf(second) == first_results
+        assert len(processor.processed) == 1
+
+def test_changed_text_is_reprocessed():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        lines = [f'Line {i} of a long resume about Python services and data pipelines' for i in range(30)]
+        first, second = os.path.join(tmp_dir, 'first.pdf'), os.path.join(tmp_dir, 'second.pdf')
+        make_text_pdf(first, lines + ['Phone: 555-0100'])
+        make_text_pdf(second, lines + ['Phone: 555-0199'])
+
+        processor = FakeProcessor()
+        deduplicator = DeduplicatingProcessor(processor, DuplicateIndex(os.path.join(tmp_dir, 'index')))
+        deduplicator.process_pdf(first)
+        deduplicator.process_pdf(second, document='job-2')
+
+        assert processor.documents == ['first.pdf', 'job-2']
+        # The documents are near-duplicates, but the page text differs
+        assert deduplicator.stats['near_duplicates'] == 1
+        assert deduplicator.stats['pages_reused'] == 0
+        assert len(processor.processed) == 2
+
+def test_other_extraction_version_is_not_reused():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'resume.pdf')
+        make_text_pdf(path, [f'Line {i} of a resume' for i in range(30)])
+        index_dir = os.path.join(tmp_dir, 'index')
+
+        DeduplicatingProcessor(FakeProcessor(), DuplicateIndex(index_dir)).process_pdf(path)
+
+        processor = FakeProcessor(version='model=other;schema=full;prompt=0')
+        deduplicator = DeduplicatingProcessor(processor, DuplicateIndex(index_dir))
+        deduplicator.process_pdf(path)
+        assert deduplicator.stats['stale_matches'] == 1
+        assert len(processor.processed) == 1
+
+        # The entry now carries the new version and is reused again
+        deduplicator.process_pdf(path)
+        assert len(processor.processed) == 1
+
+if __name__ == '__main__':
+    print("Starting deduplication test...")
+    test_textless_pdfs_are_not_merged()
+    test_near_duplicate_text_pdf_reuses_pages()
+    test_changed_text_is_reprocessed()
+    test_other_extraction_version_is_not_reused()
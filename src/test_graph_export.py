@@ -0,0 +1,73 @@
+import glob
+import json
+import os
+import tempfile
+import numpy as np
+from graph_export import build_graph, export_graph, force_layout, _grid_repulsion, _pairwise_repulsion
+
+def test_build_graph_identity():
+    acme = ([{'type': 'WorkExperience', 'properties': {'company': 'Acme', 'title': 'Software Engineer'}},
+             {'type': 'TechnicalSkill', 'properties': {'name': 'Python'}},
+             {'type': 'Education', 'properties': {'institution': 'Oregon State'}}],
+            [{'from': 'Software Engineer', 'to': 'Python', 'type': 'requires'}])
+    globex = ([{'type': 'WorkExperience', 'properties': {'company': 'Globex', 'title': 'Software Engineer'}},
+               {'type': 'TechnicalSkill', 'properties': {'name': 'python'}},
+               {'type': 'Education', 'properties': {'institution': 'Oregon State'}}],
+              [{'from': 'Globex', 'to': 'Python', 'type': 'requires'}])
+
+    nodes, edges, relationships = build_graph([acme, globex])
+    labels = [(node['type'], node['label']) for node in nodes]
+
+    # Same title at different companies stays two positions; skills are shared
+    assert ('WorkExperience', 'Software Engineer @ Acme') in labels
+    assert ('WorkExperience', 'Software Engineer @ Globex') in labels
+    assert sum(1 for node_type, _ in labels if node_type == 'TechnicalSkill') == 1
+    # Non-skill entities belong to their resume
+    assert sum(1 for node_type, _ in labels if node_type == 'Education') == 2
+
+    python = next(node['id'] for node in nodes if node['type'] == 'TechnicalSkill')
+    assert sorted(edges[:, 1].tolist()) == [python, python]
+    assert len(set(edges[:, 0].tolist())) == 2
+    assert relationships == ['requires', 'requires']
+
+def test_export_tiles_are_self_contained():
+    graph = ([{'type': 'TechnicalSkill', 'properties': {'name': f'skill {i}'}} for i in range(20)],
+             [{'from': f'skill {i}', 'to': f'skill {i + 1}', 'type': 'related'} for i in range(19)])
+    nodes, edges, relationships = build_graph([graph])
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        manifest = export_graph(nodes, edges, relationships, output_dir, max_zoom=2, iterations=20)
+        assert sorted(os.listdir(output_dir)) == ['manifest.json', 'tiles']
+
+        seen = {}
+        for path in glob.glob(os.path.join(output_dir, 'tiles', str(manifest['max_zoom']), '*.json')):
+            with open(path, 'r', encoding='utf-8') as f:
+                tile = json.load(f)
+            for node_id, x, y, node_type, degree, label in tile['nodes']:
+                seen[node_id] = label
+                assert 0 <= x <= 1 and 0 <= y <= 1
+            for edge in tile['edges']:
+                assert len(edge) == 7
+
+        assert seen == {node['id']: node['label'] for node in nodes}
+
+def test_grid_repulsion_matches_exact():
+    rng = np.random.default_rng(0)
+    positions = rng.random((3000, 2))
+    k = np.sqrt(1.0 / len(positions))
+    exact = _pairwise_repulsion(positions, positions, np.ones(len(positions)), k, 64)
+    approximate = _grid_repulsion(positions, k, 15, 64)
+
+    cosine = (exact * approximate).sum(axis=1) / (np.linalg.norm(exact, axis=1) * np.linalg.norm(approximate, axis=1))
+    assert np.percentile(cosine, 5) > 0.99
+
+    # Large graphs take the grid path and still fill the unit square
+    edges = rng.integers(0, 3000, (6000, 2))
+    layout = force_layout(3000, edges, iterations=5, exact_limit=1000)
+    assert layout.shape == (3000, 2) and layout.min() == 0.0 and layout.max() == 1.0
+
+if __name__ == '__main__':
+    print("Starting graph export test...")
+    test_build_graph_identity()
+    test_export_tiles_are_self_contained()
+    test_grid_repulsion_matches_exact()
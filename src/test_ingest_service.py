@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+from ingest_service import JobQueue, make_handler
+
+PDF_BYTES = b'%PDF-1.4\n%%EOF\n'
+
+def test_submit_claim_finish():
+    with tempfile.TemporaryDirectory() as queue_dir:
+        queue = JobQueue(queue_dir)
+        job = queue.submit(PDF_BYTES, 'resume.pdf')
+        assert os.path.basename(job['pdf_path']) == 'upload.pdf'
+        assert queue.counts() == {'pending': 1, 'running': 0, 'outstanding': 1}
+
+        claimed = queue.claim(timeout=0)
+        assert claimed['id'] == job['id'] and claimed['status'] == 'running'
+        assert queue.claim(timeout=0) is None
+        assert queue.counts() == {'pending': 0, 'running': 1, 'outstanding': 1}
+
+        # Page images rendered next to the upload are removed with it
+        with open(os.path.join(os.path.dirname(job['pdf_path']), 'page_1.png'), 'wb') as f:
+            f.write(b'png')
+        queue.finish(claimed, {'pages': ['<resume/>']})
+        assert queue.get(job['id'])['result'] == {'pages': ['<resume/>']}
+        assert queue.counts()['outstanding'] == 0
+        assert os.listdir(queue.upload_dir) == []
+
+        failed = queue.submit(PDF_BYTES, 'other.pdf')
+        queue.finish(queue.claim(timeout=0), error='boom')
+        assert queue.get(failed['id'])['status'] == 'failed'
+
+def test_recover_and_prune():
+    with tempfile.TemporaryDirectory() as queue_dir:
+        queue = JobQueue(queue_dir, retention_days=1)
+        job = queue.submit(PDF_BYTES, 'resume.pdf')
+        queue.claim(timeout=0)
+
+        # A restarted service requeues the job that was running
+        queue = JobQueue(queue_dir, retention_days=1)
+        assert queue.recover() == 1
+        claimed = queue.claim(timeout=0)
+        assert claimed['id'] == job['id'] and os.path.exists(claimed['pdf_path'])
+        queue.finish(claimed, {'pages': []})
+
+        assert queue.prune() == 0
+        old_time = time.time() - 2 * 86400
+        os.utime(os.path.join(queue_dir, 'done', f"{job['id']}.json"), (old_time, old_time))
+        assert queue.prune() == 1
+        assert queue.get(job['id']) is None
+
+def request(base_url, method, path, body=None, headers=None):
+    req = urllib.request.Request(base_url + path, data=body, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_http_endpoints():
+    with tempfile.TemporaryDirectory() as queue_dir:
+        queue = JobQueue(queue_dir)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(queue, 2, 1024))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_address[1]}'
+        try:
+            status, body = request(base_url, 'POST', '/jobs', PDF_BYTES, {'X-Filename': '../resume.pdf'})
+            assert status == 202 and body['outstanding'] == 1
+            job_id = body['job_id']
+
+            status, body = request(base_url, 'GET', f'/jobs/{job_id}')
+            assert status == 200 and body['status'] == 'pending'
+            assert body['filename'] == 'resume.pdf' and 'pdf_path' not in body
+            assert request(base_url, 'GET', f'/jobs/{job_id}/result')[0] == 409
+
+            status, body = request(base_url, 'GET', '/queue')
+            assert status == 200 and body == {'pending': 1, 'running': 0, 'outstanding': 1, 'max_outstanding': 2}
+
+            queue.finish(queue.claim(timeout=0), {'pages': ['<resume/>']})
+            status, body = request(base_url, 'GET', f'/jobs/{job_id}/result')
+            assert status == 200 and body['result'] == {'pages': ['<resume/>']}
+
+            failed_id = request(base_url, 'POST', '/jobs', PDF_BYTES)[1]['job_id']
+            queue.finish(queue.claim(timeout=0), error='boom')
+            assert request(base_url, 'GET', f'/jobs/{failed_id}/result') == (500, {'job_id': failed_id, 'error': 'boom'})
+
+            # Backpressure: uploads are rejected once the backlog is full
+            request(base_url, 'POST', '/jobs', PDF_BYTES)
+            request(base_url, 'POST', '/jobs', PDF_BYTES)
+            status, body = request(base_url, 'POST', '/jobs', PDF_BYTES)
+            assert status == 503 and body['outstanding'] == 2
+            for _ in range(2):
+                queue.finish(queue.claim(timeout=0), {'pages': []})
+
+            assert request(base_url, 'POST', '/jobs', b'not a pdf')[0] == 415
+            assert request(base_url, 'POST', '/jobs', b'%PDF' + b'0' * 2048)[0] == 413
+            assert request(base_url, 'GET', f'/jobs/{"0" * 32}')[0] == 404
+            assert request(base_url, 'GET', '/unknown')[0] == 404
+        finally:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == '__main__':
+    print("Starting ingest service test...")
+    test_submit_claim_finish()
+    test_recover_and_prune()
+    test_http_endpoints()
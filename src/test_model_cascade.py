@@ -0,0 +1,77 @@
+import tempfile
+from model_cascade import ModelCascade, score_resume_xml
+from pdf_processor import PDFProcessor
+from run_log import RunLog
+
+FIRST_PAGE = """<resume>
+    <header><name>Kirk F Truax</name><title>Software Development Apprentice</title><summary>Engineer</summary></header>
+    <skills><technical><skill><name>Python</name><proficiency>advanced</proficiency><context>APIs</context></skill></technical></skills>
+    <experience><position><company>Creating Coding Careers</company><title>Apprentice</title>
+        <duration><start>2024-02</start><end>2024-08</end></duration></position></experience>
+</resume>"""
+
+# A later page: no header or skills, but everything it does contain is filled in
+SECOND_PAGE = """<resume>
+    <header><name></name><title></title><summary></summary></header>
+    <skills><technical><skill><name></name><proficiency></proficiency><context></context></skill></technical></skills>
+    <experience><position><company>US Navy</company><title>Health Physicist</title>
+        <duration><start>2012-01</start><end>2018-06</end></duration>
+        <responsibilities><item>Ran the dosimetry program</item></responsibilities></position></experience>
+    <education><degree><level>Bachelor</level><field>Nuclear Engineering</field><institution>Oregon State</institution>
+        <graduation><status>completed</status><date>2011-06</date></graduation></degree></education>
+    <projects><project><name>Job Tracker</name><description>Resume graph</description><outcome>Used daily</outcome></project></projects>
+</resume>"""
+
+def test_score_resume_xml():
+    assert score_resume_xml(FIRST_PAGE) == 1.0
+    assert score_resume_xml(SECOND_PAGE) == 1.0
+    assert score_resume_xml('no xml here') == 0.0
+    assert score_resume_xml('<resume><header><name>A</header></resume>') == 0.0
+    assert score_resume_xml('<resume><header><name></name></header></resume>') == 0.0
+
+    # Half-filled sections score in between
+    assert score_resume_xml('<resume><header><name>A</name><title></title></header></resume>') == 0.5
+
+    # A merged document is also checked for the sections every resume needs
+    assert score_resume_xml(SECOND_PAGE, ('header', 'skills', 'experience')) < 0.7
+
+def test_cascade_run_and_report():
+    cascade = ModelCascade(['small', 'large'], threshold=0.6)
+    responses = {'small': '<resume><header><name></name><title>A</title><summary></summary></header></resume>',
+                 'large': FIRST_PAGE}
+    calls = []
+
+    def call(model):
+        calls.append(model)
+        return responses[model]
+
+    assert cascade.run(call, score_resume_xml) == (FIRST_PAGE, 'large')
+    assert calls == ['small', 'large']
+
+    responses['small'] = SECOND_PAGE
+    assert cascade.run(call, score_resume_xml) == (SECOND_PAGE, 'small')
+
+    report = cascade.report()
+    assert report['small'] == {'calls': 2, 'accepted': 1, 'hit_rate': 0.5}
+    assert report['large'] == {'calls': 1, 'accepted': 1, 'hit_rate': 0.5}
+
+def test_processor_logs_accepted_model():
+    with tempfile.TemporaryDirectory() as log_dir:
+        run_log = RunLog(log_dir)
+        processor = PDFProcessor(cascade=ModelCascade(['small', 'large']), run_log=run_log)
+        responses = {'small': '<resume><header><name></name><title>A</title></header></resume>',
+                     'large': FIRST_PAGE}
+        processor.session.chat = lambda content, images=None, model_name=None, options=None: responses[model_name]
+
+        assert processor.process_image('page_1.png', document='a.pdf', pages=[1]) == FIRST_PAGE
+        responses['small'] = SECOND_PAGE
+        assert processor.process_image('page_2.png', document='a.pdf', pages=[2]) == SECOND_PAGE
+        run_log.close()
+
+        assert [record['model'] for record in run_log.read_records()] == ['large', 'small']
+
+if __name__ == '__main__':
+    print("Starting model cascade test...")
+    test_score_resume_xml()
+    test_cascade_run_and_report()
+    test_processor_logs_accepted_model()
@@ -0,0 +1,35 @@
+import ollama_session
+from ollama_session import OllamaSession
+
+def test_same_options_and_running_report():
+    calls = []
+
+    def chat(model, messages, keep_alive, options):
+        calls.append({'model': model, 'roles': [m['role'] for m in messages],
+                      'keep_alive': keep_alive, 'options': options})
+        first = len(calls) <= 2
+        return {'message': {'content': 'OK'}, 'load_duration': 2e9 if first else 1e6,
+                'prompt_eval_duration': 5e8 if first else 1e7, 'prompt_eval_count': 100 if first else 10}
+
+    original, ollama_session.ollama.chat = ollama_session.ollama.chat, chat
+    try:
+        session = OllamaSession('model', 'system prompt', '30m', {'num_ctx': 8192})
+        session.warm_up()
+        for _ in range(3):
+            assert session.chat('page', images=['page_1.png']) == 'OK'
+    finally:
+        ollama_session.ollama.chat = original
+
+    # Warm-up and every request share num_ctx, so Ollama never reloads the runner
+    assert all(call['options']['num_ctx'] == 8192 for call in calls)
+    assert calls[0]['options']['num_predict'] == 1
+    assert all(call['roles'] == ['system', 'user'] and call['keep_alive'] == '30m' for call in calls)
+
+    report = session.report()
+    assert report['warm_up']['calls'] == 1 and report['first']['calls'] == 1
+    assert report['later'] == {'calls': 2, 'load_ms': 1.0, 'prompt_eval_ms': 10.0, 'prompt_tokens': 10.0}
+    assert session.last_metrics['prompt_eval_count'] == 10
+
+if __name__ == '__main__':
+    print("Starting Ollama session test...")
+    test_same_options_and_running_report()
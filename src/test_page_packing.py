@@ -0,0 +1,53 @@
+import tempfile
+import fitz  # PyMuPDF
+from pdf_processor import PDFProcessor
+from run_log import RunLog
+
+def make_pdf(path, page_count):
+    doc = fitz.open()
+    for i in range(page_count):
+        page = doc.new_page()
+        page.insert_text((72, 72), f'Resume page {i + 1}')
+    doc.save(path)
+    doc.close()
+
+def test_plan_page_groups():
+    processor = PDFProcessor(context_budget=8192, max_pages_per_request=2)
+    assert processor.plan_page_groups(1) == [[0]]
+    assert processor.plan_page_groups(2) == [[0, 1]]
+    assert processor.plan_page_groups(3) == [[0, 1], [2]]
+
+    # A budget too small for two pages falls back to one page per request
+    processor = PDFProcessor(context_budget=4000, max_pages_per_request=2)
+    assert processor.estimate_request_tokens(2) > 4000
+    assert processor.plan_page_groups(3) == [[0], [1], [2]]
+
+def test_process_pdf_packing_and_fallback():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = f'{tmp_dir}/resume.pdf'
+        make_pdf(pdf_path, 3)
+
+        for budget, expected in ((8192, [2, 1]), (4000, [1, 1, 1])):
+            run_log = RunLog(f'{tmp_dir}/run_log_{budget}')
+            processor = PDFProcessor(context_budget=budget, run_log=run_log)
+            calls = []
+
+            def chat(content, images=None, model_name=None, options=None):
+                calls.append(options)
+                return '<resume/>'
+
+            processor.session.chat = chat
+            results = processor.process_pdf(pdf_path, pack_pages=True)
+            run_log.close()
+
+            # Every request uses the session's num_ctx, packed or not, so the model is never reloaded
+            assert calls == [None] * len(expected)
+            assert processor.session.options == {'num_ctx': budget}
+            assert len(results) == len(expected)
+            assert [entry['pages'] for entry in run_log.read_index()] == (
+                [[1, 2], [3]] if budget == 8192 else [[1], [2], [3]])
+
+if __name__ == '__main__':
+    print("Starting page packing test...")
+    test_plan_page_groups()
+    test_process_pdf_packing_and_fallback()
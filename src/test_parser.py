@@ -31,7 +31,7 @@ def test_parser():
 </resume>"""
 
     # Create parser instance
-    parser = KnowledgeGraphParser()
+    parser = KnowledgeGraphParser(verbose=True)
     
     # Process the XML
     print("Starting parser test...")
@@ -0,0 +1,38 @@
+import os
+import tempfile
+from replay import replay
+from run_log import RunLog
+
+def test_replay_against_baseline():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_dir = os.path.join(tmp_dir, 'run_log')
+        run_log = RunLog(log_dir)
+        for page in (1, 2, 3):
+            run_log.log('vision_extraction', 'prompt', f'<resume><header><name>Page {page}</name></header></resume>',
+                        document='a.pdf', pages=[page])
+        run_log.log('graph_analysis', 'prompt', 'no entities here', document='a.pdf')
+        run_log.close()
+
+        baseline_path = os.path.join(tmp_dir, 'baseline.jsonl')
+        report = replay([log_dir], baseline_path, workers=1)
+        assert report['items'] == 4
+        assert report['items_per_second'] > 0
+
+        # Rewrite one saved response in place, as if the model had answered differently
+        segment = os.path.join(run_log.segment_dir, os.listdir(run_log.segment_dir)[0])
+        with run_log._open_read(segment) as f:
+            content = f.read()
+        with open(segment, 'wb') as f:
+            f.write(run_log._compress(content.replace('Page 2', 'Page two, with a <title>New</title>')
+                                      .encode('utf-8')))
+
+        report = replay([log_dir], os.path.join(tmp_dir, 'second.jsonl'), baseline_path, workers=1)
+        assert report['items'] == 4
+        assert len(report['changed']) == 1
+        previous, result = report['changed'][0]
+        assert result['pages'] == [2] and previous['digest'] != result['digest']
+        assert report['added'] == 0 and report['missing'] == 0
+
+if __name__ == '__main__':
+    print("Starting replay test...")
+    test_replay_against_baseline()
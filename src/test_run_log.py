@@ -0,0 +1,103 @@
+import os
+import tempfile
+import time
+from run_log import RunLog, RunLogReader
+from replay import load_saved_outputs
+from knowledge_graph_parser import KnowledgeGraphParser
+
+def test_log_and_read():
+    with tempfile.TemporaryDirectory() as log_dir:
+        writer = RunLog(log_dir)
+        writer.log('vision_extraction', 'prompt A', '<resume>1</resume>', model='m', document='a.pdf', pages=[1])
+        writer.log('vision_extraction', 'prompt A', '<resume>2</resume>', model='m', document='a.pdf', pages=[2])
+        writer.log('graph_analysis', 'prompt B', 'analysis', model='m', document='b.pdf')
+        writer.flush()
+
+        # A second instance can read records while the writer still has the segment open
+        reader = RunLog(log_dir)
+        records = list(reader.read_records())
+        assert [r['response'] for r in records] == ['<resume>1</resume>', '<resume>2</resume>', 'analysis']
+        assert [r['response'] for r in reader.read_records(document='a.pdf', page=2)] == ['<resume>2</resume>']
+        assert reader.read_prompt(records[0]['prompt_sha']) == 'prompt A'
+        assert len(os.listdir(reader.prompt_dir)) == 2
+
+        writer.close()
+        reader.close()
+
+def test_read_only_replay():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        missing = os.path.join(tmp_dir, 'missing')
+        assert list(RunLogReader(missing).read_records()) == []
+        assert not os.path.exists(missing)
+
+        writer = RunLog(os.path.join(tmp_dir, 'run_log'))
+        writer.log('vision_extraction', 'prompt', '<resume/>', document='a.pdf', pages=[1])
+        writer.flush()
+        contents = sorted(os.listdir(writer.log_dir))
+
+        # Replay reads the open log without touching it
+        items = list(load_saved_outputs([writer.log_dir]))
+        assert [(i['document'], i['response']) for i in items] == [('a.pdf', '<resume/>')]
+        assert sorted(os.listdir(writer.log_dir)) == contents
+        writer.close()
+
+class FakeSession:
+    def chat(self, content, images=None, model_name=None, options=None):
+        return 'analysis'
+
+def test_graph_analysis_prompt_stored_once():
+    with tempfile.TemporaryDirectory() as log_dir:
+        run_log = RunLog(log_dir)
+        parser = KnowledgeGraphParser(run_log=run_log, session=FakeSession())
+        for i in range(5):
+            parser.analyze_xml_with_llama(f'<resume><header><name>Candidate {i}</name></header></resume>', f'{i}.pdf')
+        run_log.close()
+
+        # The analysis instructions are stored once; each resume travels with its record
+        assert len(os.listdir(run_log.prompt_dir)) == 1
+        records = list(run_log.read_records())
+        assert run_log.read_prompt(records[0]['prompt_sha']) == parser.get_system_prompt()
+        assert [r['metadata']['payload'] for r in records] == [
+            parser.get_resume_payload(f'<resume><header><name>Candidate {i}</name></header></resume>')
+            for i in range(5)]
+
+def test_truncated_segment():
+    with tempfile.TemporaryDirectory() as log_dir:
+        run_log = RunLog(log_dir)
+        run_log.log('vision_extraction', 'prompt', 'first', document='a.pdf', pages=[1])
+        run_log.close()
+
+        # Simulate a crash part way through appending the next frame
+        segment = os.path.join(run_log.segment_dir, os.listdir(run_log.segment_dir)[0])
+        with open(segment, 'rb') as f:
+            frame = f.read()
+        with open(segment, 'ab') as f:
+            f.write(frame[:len(frame) // 2])
+
+        assert [r['response'] for r in RunLog(log_dir).read_records()] == ['first']
+
+def test_prune():
+    with tempfile.TemporaryDirectory() as log_dir:
+        run_log = RunLog(log_dir, max_records_per_segment=1)
+        run_log.log('vision_extraction', 'old prompt', 'old', document='a.pdf')
+        run_log.flush()
+        run_log.log('vision_extraction', 'new prompt', 'new', document='b.pdf')
+        run_log.close()
+
+        old_segment = run_log.read_index()[0]['segment']
+        old_time = time.time() - 40 * 86400
+        os.utime(os.path.join(run_log.segment_dir, old_segment), (old_time, old_time))
+
+        pruned = RunLog(log_dir, retention_days=30)
+        pruned.close()
+        assert [e['document'] for e in pruned.read_index()] == ['b.pdf']
+        assert [r['response'] for r in pruned.read_records()] == ['new']
+        assert len(os.listdir(pruned.prompt_dir)) == 1
+
+if __name__ == '__main__':
+    print("Starting run log test...")
+    test_log_and_read()
+    test_read_only_replay()
+    test_graph_analysis_prompt_stored_once()
+    test_truncated_segment()
+    test_prune()
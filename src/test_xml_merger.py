@@ -0,0 +1,89 @@
+import xml.etree.ElementTree as ET
+from xml_merger import XMLMerger
+
+def test_merge_pages():
+    # Two pages of the same resume, with the second position split by the page break
+    pages = [
+        """Here is the extracted XML:
+<resume>
+    <header>
+        <name>Kirk F Truax</name>
+        <title>Software Development Apprentice</title>
+        <summary></summary>
+    </header>
+    <skills>
+        <technical>
+            <skill><name>Python</name><proficiency>advanced</proficiency><context></context></skill>
+            <skill><name>SQL</name><proficiency>intermediate</proficiency><context></context></skill>
+        </technical>
+    </skills>
+    <experience>
+        <position>
+            <company>Creating Coding Careers</company>
+            <title>Software Development Apprentice</title>
+            <duration><start>2024-02</start><end>2024-08</end></duration>
+        </position>
+        <position>
+            <company>Navy Medicine Readiness and Training Command</company>
+            <title>Radiation Health Officer</title>
+            <duration><start>2022-03</start><end></end></duration>
+            <responsibilities><item>Managed intake & monitoring</item></responsibilities>
+        </position>
+    </experience>
+</resume>""",
+        """<resume>
+    <header>
+        <name>Kirk F Truax</name>
+        <title></title>
+        <summary>Engineer and former naval officer</summary>
+    </header>
+    <skills>
+        <technical>
+            <skill><name>python</name><proficiency></proficiency><context>Flask services</context></skill>
+            <skill><name>Java</name><proficiency>intermediate</proficiency><context></context></skill>
+        </technical>
+    </skills>
+    <experience>
+        <position>
+            <company></company>
+            <title></title>
+            <duration><start></start><end>2024-02</end></duration>
+            <responsibilities><item>Led dosimetry program audits</item></responsibilities>
+        </position>
+    </experience>
+    <projects>
+        <project><name>Job Tracker</name><description>Resume knowledge graph</description></project>
+    </projects>
+</resume>""",
+    ]
+
+    merger = XMLMerger()
+    merged = ET.fromstring(merger.merge_documents(pages))
+
+    print("\nMerged document:")
+    print(ET.tostring(merged, encoding='unicode'))
+
+    assert len(merged.findall('header')) == 1
+    assert merged.findtext('header/title') == 'Software Development Apprentice'
+    assert merged.findtext('header/summary') == 'Engineer and former naval officer'
+
+    skills = [s.findtext('name') for s in merged.findall('skills/technical/skill')]
+    assert skills == ['Python', 'SQL', 'Java']
+    assert merged.find('skills/technical/skill').findtext('context') == 'Flask services'
+
+    positions = merged.findall('experience/position')
+    assert len(positions) == 2
+    assert positions[1].findtext('duration/end') == '2024-02'
+    items = [i.text for i in positions[1].findall('responsibilities/item')]
+    assert items == ['Managed intake & monitoring', 'Led dosimetry program audits']
+
+    assert merged.findtext('projects/project/name') == 'Job Tracker'
+
+def test_merge_without_xml():
+    merger = XMLMerger()
+    assert merger.merge_documents(["No resume here", "<resume><header>"]) is None
+
+if __name__ == '__main__':
+    print("Starting XML merger test...")
+    test_merge_pages()
+    test_merge_without_xml()
@@ -0,0 +1,145 @@
+import tempfile
+from pdf_processor import PDFProcessor
+from run_log import RunLog
+from xml_validator import XMLValidator, RESUME_XML_SPEC, STRUCTURED_XML_SPEC
+
+CONTINUATION_PAGE = """<resume>
+    <experience>
+        <position>
+            <company></company>
+            <title></title>
+            <duration><start></start><end>2018-06</end></duration>
+            <responsibilities><item>Ran the dosimetry program</item></responsibilities>
+        </position>
+    </experience>
+</resume>"""
+
+def test_valid_resume():
+    xml_content = """<resume>
+    <identity>
+        <name>Kirk F Truax</name>
+        <currentTitle>Software Development Apprentice</currentTitle>
+        <location></location>
+        <clearance></clearance>
+    </identity>
+    <skills>
+        <technical><skill name="Python" level="advanced" context="Flask services"/></technical>
+        <domain><expertise name="Health physics" years="6" context="Navy"/></domain>
+        <soft><skill name="Leadership" demonstrated_at="Navy Medicine"/></soft>
+    </skills>
+    <experience>
+        <position>
+            <company>Creating Coding Careers</company>
+            <title>Software Development Apprentice</title>
+            <duration><start>2024-02</start><end>2024-08</end></duration>
+            <skills_used><skill name="Python" context="APIs"/></skills_used>
+        </position>
+    </experience>
+    <education></education>
+    <certifications></certifications>
+    <projects></projects>
+</resume>"""
+
+    issues = XMLValidator(RESUME_XML_SPEC).validate(xml_content)
+    print("\nIssues:", issues)
+    assert issues == []
+
+def test_invalid_resume():
+    xml_content = """Here is the XML:
+<resume>
+    <header><name>Kirk F Truax</name></header>
+    <skills><technical><skill><name>Python</name><proficiency>Proficient</proficiency></skill></technical></skills>
+    <experience>
+        <position>
+            <company>Creating Coding Careers</company>
+            <title></title>
+            <duration><start>February 2024</start><end>Present</end></duration>
+            <achievements><achievement><technologies_used><tech>Docker</tech></technologies_used></achievement></achievements>
+        </position>
+    </experience>
+    <education></education>
+</resume>"""
+
+    issues = XMLValidator(STRUCTURED_XML_SPEC).validate(xml_content)
+    print("\nIssues:")
+    for issue in issues:
+        print(f"  {issue['severity']} {issue['code']} {issue['path']}")
+
+    found = {(issue['severity'], issue['code'], issue['path']) for issue in issues}
+    assert ('error', 'missing_tag', 'header/title') in found
+    assert ('error', 'empty_field', 'experience/position/title') in found
+    assert ('error', 'bad_date', 'experience/position/duration/start') in found
+    assert ('warning', 'bad_value', 'skills/technical/skill/proficiency') in found
+    assert ('warning', 'unknown_skill',
+            'experience/position/achievements/achievement/technologies_used/tech') in found
+    assert len(issues) == 5
+
+def test_continuation_page():
+    # Second page: no header or skills, and a position continued from page one
+    xml_content = """<resume>
+    <experience>
+        <position>
+            <company></company>
+            <title></title>
+            <duration><start></start><end>2018-06</end></duration>
+            <responsibilities><item>Ran the dosimetry program</item></responsibilities>
+        </position>
+    </experience>
+    <education><degree><level>Bachelor</level><field>Nuclear Engineering</field><institution>Oregon State</institution></degree></education>
+</resume>"""
+
+    validator = XMLValidator(STRUCTURED_XML_SPEC)
+    assert validator.errors(xml_content, page=True) == []
+
+    # The same content as a whole document is still missing required sections
+    codes = {(issue['code'], issue['path']) for issue in validator.errors(xml_content)}
+    assert ('missing_tag', 'header/name') in codes
+    assert ('empty_field', 'experience/position/company') in codes
+
+    # Page-level checks still catch bad dates
+    bad_date = xml_content.replace('2018-06', 'June 2018')
+    assert [issue['code'] for issue in validator.errors(bad_date, page=True)] == ['bad_date']
+    for month in ('2018-13', '2018-99', '2018-00'):
+        bad_month = xml_content.replace('2018-06', month)
+        assert [issue['code'] for issue in validator.errors(bad_month, page=True)] == ['bad_date']
+    assert validator.errors(xml_content.replace('2018-06', '2018-06-15'), page=True) == []
+
+def test_malformed_resume():
+    issues = XMLValidator().validate("<resume><identity><name>A</identity></resume>")
+    assert [issue['code'] for issue in issues] == ['malformed']
+
+def test_processor_repairs_failing_page():
+    with tempfile.TemporaryDirectory() as log_dir:
+        run_log = RunLog(log_dir)
+        processor = PDFProcessor(validator=XMLValidator(STRUCTURED_XML_SPEC), run_log=run_log)
+        responses = [CONTINUATION_PAGE.replace('2018-06', 'June 2018'), CONTINUATION_PAGE]
+        prompts = []
+
+        def chat(content, images=None, model_name=None, options=None):
+            prompts.append(content)
+            return responses[len(prompts) - 1]
+
+        processor.session.chat = chat
+        assert processor.process_image('page_2.png', document='a.pdf', pages=[2]) == CONTINUATION_PAGE
+        run_log.close()
+
+        assert len(prompts) == 2
+        assert processor.validation_stats == {'pages': 1, 'valid': 0, 'repaired': 1, 'failed': 0}
+
+        # The failing response is kept under the extraction prompt, the fix under its own record
+        extraction, repair = run_log.read_records()
+        assert extraction['kind'] == 'vision_extraction' and extraction['response'] == responses[0]
+        assert extraction['metadata']['validation_errors'] == ['bad_date']
+        assert run_log.read_prompt(extraction['prompt_sha']) == processor.get_packed_prompt(1)
+        assert repair['kind'] == 'vision_repair' and repair['response'] == CONTINUATION_PAGE
+        assert repair['metadata']['repair_of'] == extraction['id']
+        assert repair['metadata']['payload'] == prompts[1] and repair['metadata']['accepted']
+        assert run_log.read_prompt(repair['prompt_sha']) == processor.get_system_prompt()
+
+if __name__ == '__main__':
+    print("Starting XML validator test...")
+    test_valid_resume()
+    test_invalid_resume()
+    test_continuation_page()
+    test_malformed_resume()
+    test_processor_repairs_failing_page()
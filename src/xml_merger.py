@@ -0,0 +1,189 @@
+import copy
+import re
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple
+
+MERGER_VERSION = '1'
+
+class XMLMerger:
+    def __init__(self):
+        """Initialize merger with the list items of the resume schema.
+
+        Keyed items are matched across pages by their key fields (child text or
+        attribute); repeated leaves are simple lists that are deduplicated by text.
+        """
+        self.resume_pattern = re.compile(r'<resume[\s>][\s\S]*?</resume>')
+        self.declaration_pattern = re.compile(r'<\?xml[^>]*\?>')
+        self.bare_ampersand_pattern = re.compile(r'&(?!\w+;|#\d+;|#x[0-9a-fA-F]+;)')
+        self.item_keys: Dict[str, List[str]] = {
+            'position': ['company', 'title'],
+            'skill': ['name'],
+            'expertise': ['name'],
+            'degree': ['institution', 'field'],
+            'certification': ['name'],
+            'project': ['name'],
+            'achievement': ['description'],
+        }
+        self.repeated_tags = {'item', 'tech', 'course'}
+
+    def parse_pages(self, pages: List[str]) -> List[ET.Element]:
+        """Parse the <resume> trees out of per-page LLaMA responses.
+
+        Args:
+            pages (List[str]): Raw LLaMA output for each page
+
+        Returns:
+            List[ET.Element]: Parsed <resume> roots in page order
+        """
+        roots = []
+        for i, content in enumerate(pages, 1):
+            blocks = self.resume_pattern.findall(self.declaration_pattern.sub('', content))
+            if not blocks:
+                print(f'No <resume> element found on page {i}')
+                continue
+
+            for block in blocks:
+                try:
+                    roots.append(ET.fromstring(self.bare_ampersand_pattern.sub('&amp;', block)))
+                except ET.ParseError as e:
+                    print(f'Skipping malformed XML on page {i}: {e}')
+
+        return roots
+
+    def merge_documents(self, pages: List[str]) -> Optional[str]:
+        """Merge per-page <resume> documents into one canonical document.
+
+        Args:
+            pages (List[str]): Raw LLaMA output for each page of one resume
+
+        Returns:
+            Optional[str]: Merged XML or None if no page contained valid XML
+        """
+        roots = self.parse_pages(pages)
+        if not roots:
+            return None
+
+        merged = self.merge_trees(roots)
+        ET.indent(merged)
+        return ET.tostring(merged, encoding='unicode')
+
+    def merge_trees(self, roots: List[ET.Element]) -> ET.Element:
+        """Merge parsed <resume> roots page by page.
+
+        Args:
+            roots (List[ET.Element]): Parsed roots in page order
+
+        Returns:
+            ET.Element: Merged <resume> root
+        """
+        merged = ET.Element('resume')
+        for i, root in enumerate(roots):
+            self._merge_children(merged, root, page_start=i > 0)
+        return merged
+
+    def _normalize(self, text: Optional[str]) -> str:
+        return ' '.join((text or '').split()).lower()
+
+    def _has_content(self, element: ET.Element) -> bool:
+        if self._normalize(element.text) or any(v.strip() for v in element.attrib.values()):
+            return True
+        return any(self._has_content(child) for child in element)
+
+    def _item_key(self, element: ET.Element) -> Tuple[str, ...]:
+        fields = self.item_keys[element.tag]
+        return tuple(self._normalize(element.findtext(f) or element.get(f)) for f in fields)
+
+    def _merge_children(self, target: ET.Element, source: ET.Element, page_start: bool) -> None:
+        first_item = True
+        for child in source:
+            if child.tag in self.item_keys:
+                self._merge_item(target, child, continuation=page_start and first_item)
+                first_item = False
+            elif len(child) == 0:
+                self._merge_leaf(target, child)
+            else:
+                existing = target.find(child.tag)
+                if existing is None:
+                    existing = ET.SubElement(target, child.tag, child.attrib)
+                self._merge_children(existing, child, page_start)
+
+    def _merge_leaf(self, target: ET.Element, child: ET.Element) -> None:
+        text = self._normalize(child.text)
+        existing = target.findall(child.tag)
+
+        if not existing:
+            target.append(copy.deepcopy(child))
+        elif not text and not child.attrib:
+            return
+        elif any(self._normalize(e.text) == text and e.attrib == child.attrib for e in existing):
+            return
+        elif child.tag in self.repeated_tags:
+            if not self._has_content(existing[-1]):
+                target.remove(existing[-1])
+            target.append(copy.deepcopy(child))
+        elif not self._has_content(existing[0]):
+            existing[0].text = child.text
+            existing[0].attrib.update(child.attrib)
+
+    def _merge_item(self, target: ET.Element, child: ET.Element, continuation: bool) -> None:
+        if not self._has_content(child):
+            return
+
+        key = self._item_key(child)
+        siblings = [s for s in target.findall(child.tag) if self._has_content(s)]
+
+        # A first item on a new page that repeats or omits the last item's
+        # key fields continues it across the page break
+        if continuation and siblings:
+            last_key = self._item_key(siblings[-1])
+            if all(not k or k == last for k, last in zip(key, last_key)):
+                self._merge_into(siblings[-1], child)
+                return
+
+        if any(key):
+            for sibling in siblings:
+                if self._item_key(sibling) == key:
+                    self._merge_into(sibling, child)
+                    return
+
+        for placeholder in target.findall(child.tag):
+            if not self._has_content(placeholder):
+                target.remove(placeholder)
+        target.append(copy.deepcopy(child))
+
+    def _merge_into(self, target: ET.Element, source: ET.Element) -> None:
+        for name, value in source.attrib.items():
+            if value.strip() and not target.get(name, '').strip():
+                target.set(name, value)
+        self._merge_children(target, source, page_start=False)
+
+def main():
+    # Example usage with a position continued across a page break
+    pages = [
+        """<resume>
+            <header><name>Kirk F Truax</name><title>Software Development Apprentice</title></header>
+            <experience>
+                <position>
+                    <company>Creating Coding Careers</company>
+                    <title>Software Development Apprentice</title>
+                    <responsibilities><item>Built REST APIs</item></responsibilities>
+                </position>
+            </experience>
+        </resume>""",
+        """<resume>
+            <header><name>Kirk F Truax</name><title></title></header>
+            <experience>
+                <position>
+                    <company></company>
+                    <title></title>
+                    <responsibilities><item>Mentored new apprentices</item></responsibilities>
+                </position>
+            </experience>
+        </resume>""",
+    ]
+
+    merger = XMLMerger()
+    print(merger.merge_documents(pages))
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
 import re
 from typing import Dict, List, Optional
 
+PARSER_VERSION = '1'
+
 class XMLProcessor:
     def __init__(self):
         self.xml_tag_pattern = re.compile(r'<([a-zA-Z][a-zA-Z0-9-_]*)[>\s]')
@@ -0,0 +1,220 @@
+import re
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple
+
+# Schema requested by llama_prompts.get_resume_xml_prompt
+RESUME_XML_SPEC = {
+    'required': [
+        'identity/name', 'identity/currentTitle', 'identity/location', 'identity/clearance',
+        'skills/technical', 'skills/domain', 'skills/soft',
+        'experience', 'education', 'certifications', 'projects',
+    ],
+    'items': {
+        'skills/technical/skill': {'attributes': ['name', 'level', 'context'], 'filled': ['@name']},
+        'skills/domain/expertise': {'attributes': ['name', 'years', 'context'], 'filled': ['@name']},
+        'skills/soft/skill': {'attributes': ['name', 'demonstrated_at'], 'filled': ['@name']},
+        'experience/position': {'children': ['company', 'title', 'duration/start', 'duration/end'],
+                                'filled': ['company', 'title']},
+        'experience/position/highlights/item': {'attributes': ['impact', 'metrics']},
+        'experience/position/skills_used/skill': {'attributes': ['name', 'context'], 'filled': ['@name']},
+        'education/degree': {'children': ['type', 'field', 'institution', 'completion'],
+                             'filled': ['institution']},
+        'certifications/certification': {'children': ['name', 'issuer', 'date', 'status'],
+                                          'filled': ['name']},
+        'projects/project': {'children': ['name', 'description'], 'filled': ['name']},
+        'projects/project/technologies_used/tech': {'attributes': ['name', 'purpose'], 'filled': ['@name']},
+    },
+    'dates': [
+        'experience/position/duration/start', 'experience/position/duration/end',
+        'education/degree/completion', 'certifications/certification/date',
+    ],
+    'enums': {},
+    'skills': ['skills/technical/skill@name', 'skills/domain/expertise@name'],
+    'skill_references': ['experience/position/skills_used/skill@name',
+                         'projects/project/technologies_used/tech@name'],
+}
+
+# Schema requested by PDFProcessor.get_structured_prompt
+STRUCTURED_XML_SPEC = {
+    'required': ['header/name', 'header/title', 'skills', 'experience', 'education'],
+    'items': {
+        'skills/technical/skill': {'children': ['name', 'proficiency'], 'filled': ['name']},
+        'skills/soft/skill': {'children': ['name'], 'filled': ['name']},
+        'experience/position': {'children': ['company', 'title', 'duration/start', 'duration/end'],
+                                'filled': ['company', 'title']},
+        'education/degree': {'children': ['level', 'field', 'institution'], 'filled': ['institution']},
+        'certifications/certification': {'children': ['name', 'issuer', 'date'], 'filled': ['name']},
+        'projects/project': {'children': ['name', 'description'], 'filled': ['name']},
+    },
+    'dates': [
+        'experience/position/duration/start', 'experience/position/duration/end',
+        'education/degree/graduation/date', 'certifications/certification/date',
+    ],
+    'enums': {
+        'skills/technical/skill/proficiency': ['expert', 'advanced', 'intermediate', 'beginner'],
+        'education/degree/level': ['bachelor', 'master', 'phd'],
+        'education/degree/graduation/status': ['completed', 'ongoing', 'expected'],
+        'certifications/certification/status': ['active', 'expired'],
+    },
+    'skills': ['skills/technical/skill/name'],
+    'skill_references': ['experience/position/achievements/achievement/technologies_used/tech',
+                         'projects/project/technologies/tech'],
+}
+
+class XMLValidator:
+    def __init__(self, spec: Dict = None):
+        """Initialize a local validator for extracted resume XML.
+
+        Args:
+            spec (Dict, optional): Schema spec, defaults to RESUME_XML_SPEC
+        """
+        self.spec = spec or RESUME_XML_SPEC
+        self.resume_pattern = re.compile(r'<resume[\s>][\s\S]*?</resume>')
+        self.bare_ampersand_pattern = re.compile(r'&(?!\w+;|#\d+;|#x[0-9a-fA-F]+;)')
+        self.date_pattern = re.compile(r'^(\d{4}(-(0[1-9]|1[0-2])(-\d{2})?)?|present|current|ongoing)$',
+                                       re.IGNORECASE)
+
+    def validate(self, content: str, page: bool = False) -> List[Dict]:
+        """Check a LLaMA response against the schema.
+
+        A single page holds only part of a resume: sections can be on other
+        pages and a position continued from the previous page has no company
+        or title. Page-level checks are therefore limited to well-formedness,
+        dates, enums and skill references; required tags, item structure and
+        filled fields are only checked on the merged document.
+
+        Args:
+            content (str): Raw LLaMA response containing a <resume> element
+            page (bool): Validate one page instead of a whole document
+
+        Returns:
+            List[Dict]: Issues with severity ('error' or 'warning'), code, path and message
+        """
+        match = self.resume_pattern.search(content)
+        if not match:
+            return [self._issue('error', 'missing_root', 'resume', 'No <resume> element found')]
+
+        try:
+            root = ET.fromstring(self.bare_ampersand_pattern.sub('&amp;', match.group(0)))
+        except ET.ParseError as e:
+            return [self._issue('error', 'malformed', 'resume', f'XML is not well-formed: {e}')]
+
+        issues = []
+        if not page:
+            for path in self.spec['required']:
+                if root.find(path) is None:
+                    issues.append(self._issue('error', 'missing_tag', path, f'Required tag <{path}> is missing'))
+
+            for item_path, rules in self.spec['items'].items():
+                for path, element in self._find_all(root, item_path):
+                    issues.extend(self._check_item(path, element, rules))
+
+        for date_path in self.spec['dates']:
+            for path, element in self._find_all(root, date_path):
+                value = (element.text or '').strip()
+                if value and not self.date_pattern.match(value):
+                    issues.append(self._issue('error', 'bad_date', path,
+                                              f'Date "{value}" is not in YYYY-MM format'))
+
+        for enum_path, allowed in self.spec['enums'].items():
+            for path, element in self._find_all(root, enum_path):
+                value = (element.text or '').strip()
+                if value and value.lower() not in allowed:
+                    issues.append(self._issue('warning', 'bad_value', path,
+                                              f'"{value}" is not one of {", ".join(allowed)}'))
+
+        issues.extend(self._check_skill_references(root))
+        return issues
+
+    def errors(self, content: str, page: bool = False) -> List[Dict]:
+        """Only the issues that should trigger a repair."""
+        return [issue for issue in self.validate(content, page) if issue['severity'] == 'error']
+
+    def _issue(self, severity: str, code: str, path: str, message: str) -> Dict:
+        return {'severity': severity, 'code': code, 'path': path, 'message': message}
+
+    def _find_all(self, root: ET.Element, path: str) -> List[Tuple[str, ET.Element]]:
+        """Find elements for a path, labelling repeated elements with 1-based indices."""
+        found = [('', root)]
+        for tag in path.split('/'):
+            next_found = []
+            for prefix, element in found:
+                children = element.findall(tag)
+                for i, child in enumerate(children, 1):
+                    label = f'{tag}[{i}]' if len(children) > 1 else tag
+                    next_found.append((f'{prefix}/{label}' if prefix else label, child))
+            found = next_found
+        return found
+
+    def _value(self, element: ET.Element, field: str) -> Optional[str]:
+        if field.startswith('@'):
+            return element.get(field[1:])
+        return element.findtext(field)
+
+    def _check_item(self, path: str, element: ET.Element, rules: Dict) -> List[Dict]:
+        issues = []
+        for child in rules.get('children', []):
+            if element.find(child) is None:
+                issues.append(self._issue('error', 'missing_tag', f'{path}/{child}',
+                                          f'<{element.tag}> is missing <{child}>'))
+
+        for attribute in rules.get('attributes', []):
+            if attribute not in element.attrib:
+                issues.append(self._issue('error', 'missing_attribute', f'{path}@{attribute}',
+                                          f'<{element.tag}> is missing the {attribute} attribute'))
+
+        # Items left entirely empty are template placeholders, not extraction errors
+        if not any((e.text or '').strip() or any(v.strip() for v in e.attrib.values())
+                   for e in element.iter()):
+            return issues
+
+        for field in rules.get('filled', []):
+            value = self._value(element, field)
+            if value is not None and not value.strip():
+                issues.append(self._issue('error', 'empty_field', f'{path}/{field}',
+                                          f'<{element.tag}> has an empty {field.lstrip("@")}'))
+        return issues
+
+    def _reference_values(self, root: ET.Element, reference: str) -> List[Tuple[str, str]]:
+        path, _, attribute = reference.partition('@')
+        values = []
+        for element_path, element in self._find_all(root, path):
+            value = element.get(attribute) if attribute else element.text
+            if value and value.strip():
+                values.append((element_path, value.strip()))
+        return values
+
+    def _check_skill_references(self, root: ET.Element) -> List[Dict]:
+        known = {value.lower() for reference in self.spec['skills']
+                 for _, value in self._reference_values(root, reference)}
+        if not known:
+            return []
+
+        issues = []
+        for reference in self.spec['skill_references']:
+            for path, value in self._reference_values(root, reference):
+                if value.lower() not in known:
+                    issues.append(self._issue('warning', 'unknown_skill', path,
+                                              f'"{value}" is used but not listed under skills'))
+        return issues
+
+def main():
+    # Example usage with a position missing its title and a free-text date
+    xml_content = """<resume>
+        <header><name>Kirk F Truax</name><title>Software Development Apprentice</title></header>
+        <skills><technical><skill><name>Python</name><proficiency>advanced</proficiency></skill></technical></skills>
+        <experience>
+            <position>
+                <company>Creating Coding Careers</company>
+                <duration><start>February 2024</start><end>2024-08</end></duration>
+            </position>
+        </experience>
+        <education></education>
+    </resume>"""
+
+    validator = XMLValidator(STRUCTURED_XML_SPEC)
+    for issue in validator.validate(xml_content):
+        print(f"{issue['severity']:8} {issue['code']:18} {issue['path']}: {issue['message']}")
+
+if __name__ == '__main__':
+    main()